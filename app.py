@@ -1,67 +1,714 @@
 from __future__ import annotations
 
-import json
 import os
-from collections import defaultdict, deque
-from datetime import datetime
+
+if os.environ.get("GEVENT_WORKER"):  # pragma: no cover - optional dependency
+    # Patch before threading, queue and socket are imported so the writer and SMS
+    # threads become greenlets and blocking sockets yield to other requests.
+    from gevent import monkey
+
+    monkey.patch_all()
+
+import atexit
+import gzip
+import hashlib
+import html
+import itertools
+import json
+import mmap
+import queue
+import re
+import sqlite3
+import threading
+import time
+from array import array
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from datetime import date, datetime, timezone
 from statistics import mean
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from urllib.parse import parse_qs, urlencode
 
-from flask import Flask, request, jsonify, render_template_string, redirect, url_for
+from flask import Flask, Response, g, request, jsonify, redirect, stream_with_context, url_for
+from markupsafe import Markup, escape
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX
+    fcntl = None  # type: ignore
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None  # type: ignore
 
 try:
+    from requests.adapters import HTTPAdapter  # type: ignore
+    from twilio.http.http_client import TwilioHttpClient  # type: ignore
     from twilio.rest import Client  # type: ignore
 except ImportError:  # pragma: no cover - optional dependency
     Client = None  # type: ignore
 
+try:
+    import numpy as np  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    np = None  # type: ignore
+
+try:
+    from numba import njit  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    njit = None  # type: ignore
+
 try:
     from sklearn.cluster import KMeans  # type: ignore
 except ImportError:  # pragma: no cover - optional dependency
     KMeans = None  # type: ignore
 
+try:
+    from sklearn.cluster import MiniBatchKMeans  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    MiniBatchKMeans = None  # type: ignore
+
+try:
+    from flask_orjson import OrjsonProvider  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    OrjsonProvider = None  # type: ignore
 
-app = Flask(__name__)
+try:
+    import msgspec  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    msgspec = None  # type: ignore
+
+try:
+    from flask_compress import Compress  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    Compress = None  # type: ignore
 
 
-# In-memory announcements store
+app = Flask(__name__)
+if OrjsonProvider is not None:
+    app.json = OrjsonProvider(app)
+else:  # pragma: no cover - optional dependency
+    # Stdlib fallback: skip key sorting and indentation on every jsonify.
+    app.json.sort_keys = False
+    app.json.compact = True
+
+if Compress is not None:
+    # Dashboard tables and JSON compress well; tiny responses are not worth the CPU.
+    app.config.setdefault("COMPRESS_MIN_SIZE", 1024)
+    app.config.setdefault("COMPRESS_ALGORITHM", ["br", "gzip"])
+    app.config.setdefault("COMPRESS_ALGORITHM_STREAMING", ["br", "deflate"])
+    Compress(app)
+
+# Number of reverse proxies in front of the app. When set, Werkzeug's ProxyFix
+# resolves X-Forwarded-For once per request and client_ip() reads remote_addr.
+TRUSTED_PROXY_HOPS = int(os.environ.get("TRUSTED_PROXY_HOPS") or 0)
+if TRUSTED_PROXY_HOPS:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXY_HOPS)  # type: ignore[method-assign]
+
+
+# In-memory announcements store. Ids come from an atomic counter and list/dict
+# inserts are atomic, so creating an announcement takes no lock.
 announcements: List[Dict[str, Any]] = []
-next_announcement_id: int = 1
+announcements_by_id: Dict[int, Dict[str, Any]] = {}
+_announcement_ids = itertools.count(1)
+
+# Optional SQLite store (path in ANNOUNCEMENTS_DB) so announcement ids and lookups
+# are shared between worker processes; the dicts above then act as a read cache.
+ANNOUNCEMENTS_DB: Optional[str] = os.environ.get("ANNOUNCEMENTS_DB") or None
+_announcements_db: Dict[str, Any] = {"path": None, "conn": None}
+_announcements_db_lock = threading.Lock()
 
 
 EVENTS_FILE = "events.json"
+EVENTS_SNAPSHOT_FILE = "snapshot.json"
+EVENTS_ROTATE_BYTES = 32 * 1024 * 1024
+EVENTS_INGEST_CHUNK = 8 * 1024 * 1024
 SMS_RECIPIENTS_FILE = "sms_recipients.json"
 
 
+# Background writer that batches event appends onto one long-lived file handle
+EVENTS_WRITE_BATCH = 128
+# iovecs per writev call (IOV_MAX on Linux and macOS); batches are far smaller
+EVENTS_IOV_MAX = 1024
+# Batches are flushed to the OS as soon as the queue drains; fsync at most this often
+# (0 disables it and leaves durability to the OS page cache).
+EVENTS_FSYNC_SECONDS = float(os.environ.get("EVENTS_FSYNC_SECONDS", "1.0"))
+_events_queue: "queue.SimpleQueue[Any]" = queue.SimpleQueue()  # bytes lines or threading.Event barriers
+_events_fh: Optional[Any] = None
+_events_fh_path: Optional[str] = None
+_events_write_lock = threading.Lock()
+# Cross-process lock (EVENTS_FILE + ".lock") for workers sharing the log: writers hold
+# it shared around each append, rotation holds it exclusively.
+_events_lock_file: Dict[str, Any] = {"key": None, "fh": None}
+
+
+# SMS alerts are sent off the request thread; recipients fan out over a small pool
+SMS_SEND_WORKERS = 8
+_twilio_client_cache: Dict[str, Any] = {"key": None, "client": None}
+_recipients_cache: Dict[str, Any] = {"key": None, "value": [], "joined": "", "env": []}
+_recipients_version: int = 0
+_sms_queue: "queue.Queue[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]]" = queue.Queue()
+_sms_pool: Optional[ThreadPoolExecutor] = None
+
+
+# Lazily started daemon threads, keyed by name (started per process, after any fork)
+_background_threads: Dict[str, threading.Thread] = {}
+_background_threads_lock = threading.Lock()
+
+
+# Parsed events log, refreshed incrementally as the append-only file grows
+_events_lock = threading.Lock()
+_events_cache: Dict[str, Any] = {
+    "path": None,
+    "key": None,
+    "total": 0,
+    "opened_rows": [],
+    "ack_rows": [],
+    "offset": 0,
+    "ino": None,
+    "mtime_ns": 0,
+    "user_stats": {},
+    "open_events": {},
+}
+_analytics_cache: Dict[str, Any] = {"key": None, "value": None}
+ANALYTICS_REFRESH_SECONDS = 1.0
+
+
+def get_announcement(announcement_id: Optional[int]) -> Optional[Dict[str, Any]]:
+    # O(1) lookup through the id index kept in step with `announcements`
+    if announcement_id is None:
+        return None
+    ann = announcements_by_id.get(announcement_id)
+    if ann is None and ANNOUNCEMENTS_DB:
+        # Possibly created by another worker; announcements never change, so cache it.
+        with _announcements_db_lock:
+            # Another thread may have cached it while this one waited for the lock.
+            ann = announcements_by_id.get(announcement_id)
+            if ann is not None:
+                return ann
+            row = _announcements_conn().execute(
+                "SELECT id, title, details, target, created_at FROM announcements WHERE id = ?",
+                (announcement_id,),
+            ).fetchone()
+            if row is not None:
+                ann = _cache_announcement(row)
+    return ann
+
+
+def store_announcement(title: str, details: str, target: str) -> Dict[str, Any]:
+    created_at = iso_utc_now()
+    if ANNOUNCEMENTS_DB:
+        with _announcements_db_lock:
+            cursor = _announcements_conn().execute(
+                "INSERT INTO announcements (title, details, target, created_at) VALUES (?, ?, ?, ?)",
+                (title, details, target, created_at),
+            )
+            announcement_id = cursor.lastrowid
+    else:
+        announcement_id = next(_announcement_ids)
+    return _cache_announcement((announcement_id, title, details, target, created_at))
+
+
+def reset_announcements() -> None:
+    """Forget all in-memory announcements and restart ids at 1 (tests, fresh workers)."""
+    global _announcement_ids
+    announcements.clear()
+    announcements_by_id.clear()
+    _announcement_ids = itertools.count(1)
+
+
+def _cache_announcement(row: Tuple[Any, ...]) -> Dict[str, Any]:
+    ann = {"id": row[0], "title": row[1], "details": row[2], "target": row[3], "createdAt": row[4]}
+    announcements.append(ann)
+    announcements_by_id[ann["id"]] = ann
+    return ann
+
+
+def _announcements_conn() -> sqlite3.Connection:
+    """Per-process connection to ANNOUNCEMENTS_DB. Caller holds _announcements_db_lock."""
+    if _announcements_db["path"] != ANNOUNCEMENTS_DB:
+        if _announcements_db["conn"] is not None:
+            _announcements_db["conn"].close()
+        conn = sqlite3.connect(ANNOUNCEMENTS_DB, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS announcements ("
+            "id INTEGER PRIMARY KEY, title TEXT NOT NULL, details TEXT NOT NULL, "
+            "target TEXT NOT NULL, created_at TEXT NOT NULL)"
+        )
+        _announcements_db.update(path=ANNOUNCEMENTS_DB, conn=conn)
+    return _announcements_db["conn"]
+
+
 def iso_utc_now() -> str:
-    return datetime.utcnow().isoformat() + "Z"
+    return utc_now_with_epoch()[0]
+
+
+def utc_now_with_epoch() -> Tuple[str, float]:
+    """Return the current UTC time as an ISO-8601 "Z" string and as epoch seconds."""
+    global _iso_second
+    # Integer nanoseconds avoid float rounding in the fraction; the "YYYY-MM-DDTHH:MM:SS"
+    # prefix is only reformatted when the second changes.
+    ns = time.time_ns()
+    seconds, remainder = divmod(ns, 1_000_000_000)
+    cached_second, prefix = _iso_second
+    if cached_second != seconds:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds))
+        _iso_second = (seconds, prefix)
+    return f"{prefix}.{remainder // 1000:06d}Z", ns / 1e9
+
+
+# (epoch second, formatted prefix) swapped as one tuple so threads never see a torn pair
+_iso_second: Tuple[int, str] = (-1, "")
 
 
 def client_ip() -> str:
-    # Prefer X-Forwarded-For if present (first hop), otherwise remote_addr
-    xff = request.headers.get("X-Forwarded-For")
+    # Behind ProxyFix remote_addr is already the client address
+    if TRUSTED_PROXY_HOPS:
+        return request.remote_addr or ""
+    # Prefer X-Forwarded-For if present (first hop), otherwise remote_addr.
+    # Read from the WSGI environ dict rather than through EnvironHeaders.
+    xff = request.environ.get("HTTP_X_FORWARDED_FOR")
     if xff:
-        return xff.split(",")[0].strip()
+        # An empty first hop (e.g. ", 10.0.0.2") falls back to the socket peer
+        first_hop = xff.partition(",")[0].strip()
+        if first_hop:
+            return first_hop
     return request.remote_addr or ""
 
 
+def request_origin() -> Tuple[str, str]:
+    """Return (client ip, user agent) for the current request, computed once and kept on `g`."""
+    origin = g.get("request_origin")
+    if origin is None:
+        origin = g.request_origin = (client_ip(), request.environ.get("HTTP_USER_AGENT", ""))
+    return origin
+
+
+def dumps_event(event: Dict[str, Any]) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(event)
+    return json.dumps(event, ensure_ascii=False).encode("utf-8")
+
+
+def dumps_event_line(event: Dict[str, Any]) -> bytes:
+    # orjson appends the newline itself, saving a bytes concatenation per event
+    if orjson is not None:
+        return orjson.dumps(event, option=orjson.OPT_APPEND_NEWLINE)
+    return dumps_event(event) + b"\n"
+
+
+# orjson.JSONDecodeError subclasses ValueError, as json.JSONDecodeError does
+loads_event = orjson.loads if orjson is not None else json.loads
+
+
 def append_event(event: Dict[str, Any]) -> None:
-    line = json.dumps(event, ensure_ascii=False)
-    with open(EVENTS_FILE, "a", encoding="utf-8") as f:
-        f.write(line + "\n")
+    # Serialized here so a bad event fails on its own request and the writer only does I/O.
+    try:
+        line = dumps_event_line(event)
+    except TypeError:
+        app.logger.exception("Dropping event that cannot be serialized: %r", event)
+        return
+    _ensure_background_thread("events-writer", _events_writer_loop)
+    _events_queue.put(line)
+
+
+def flush_events(timeout: float = 2.0) -> None:
+    """Block until events queued so far have been written to EVENTS_FILE."""
+    writer = _background_threads.get("events-writer")
+    if writer is None or not writer.is_alive():
+        return
+    done = threading.Event()
+    _events_queue.put(done)
+    done.wait(timeout)
+
+
+@atexit.register
+def close_events_log() -> None:
+    """Drain queued events and close the log handle; the writer thread is a daemon."""
+    flush_events()
+    with _events_write_lock:
+        _close_events_fh()
+
+
+def _close_events_fh() -> None:
+    """Sync and close the writer's log handle, if open. Caller holds _events_write_lock.
+
+    The writer's timed fsync only reaches the current handle, so whatever was
+    written to a handle being dropped (exit, rotation, reopen) is synced here.
+    """
+    global _events_fh, _events_fh_path
+    fh, path = _events_fh, _events_fh_path
+    _events_fh = _events_fh_path = None
+    if fh is None:
+        return
+    try:
+        if EVENTS_FSYNC_SECONDS:
+            os.fsync(fh.fileno())
+    except OSError:
+        app.logger.exception("Failed to sync %s", path)
+    try:
+        fh.close()
+    except OSError:
+        app.logger.exception("Failed to close %s", path)
+
+
+def _ensure_background_thread(name: str, target: Any) -> None:
+    thread = _background_threads.get(name)
+    if thread is not None and thread.is_alive():
+        return
+    with _background_threads_lock:
+        thread = _background_threads.get(name)
+        if thread is None or not thread.is_alive():
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            _background_threads[name] = thread
 
 
-def _dedupe_preserve_order(values: List[str]) -> List[str]:
-    seen = set()
-    result: List[str] = []
-    for value in values:
-        normalized = value.strip()
-        if not normalized:
+@contextmanager
+def _events_flock(exclusive: bool = False) -> Iterator[None]:
+    """Hold the cross-process events lock for the block. Caller holds _events_write_lock.
+
+    flock belongs to the open file, which this process's threads share, so the
+    thread lock has to keep them from locking and unlocking it concurrently.
+    """
+    if fcntl is None:  # pragma: no cover - non-POSIX
+        yield
+        return
+    # Keyed by pid too: a handle inherited across fork would share the lock with the parent.
+    key = (EVENTS_FILE + ".lock", os.getpid())
+    if _events_lock_file["key"] != key:
+        _events_lock_file.update(key=key, fh=open(key[0], "ab"))
+    fd = _events_lock_file["fh"].fileno()
+    fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+    try:
+        yield
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+def _events_handle() -> Any:
+    """Append handle for EVENTS_FILE. Caller holds the events lock (shared at least).
+
+    Reopened when the path changes or the file was rotated away, possibly by
+    another worker, so appends never land in a renamed log.
+    """
+    global _events_fh, _events_fh_path
+    if _events_fh is not None and _events_fh_path == EVENTS_FILE:
+        try:
+            if os.stat(EVENTS_FILE).st_ino == os.fstat(_events_fh.fileno()).st_ino:
+                return _events_fh
+        except FileNotFoundError:
+            pass
+    _close_events_fh()
+    # Unbuffered: every batch is handed to the kernel in one gather write anyway.
+    _events_fh = open(EVENTS_FILE, "ab", buffering=0)
+    _events_fh_path = EVENTS_FILE
+    return _events_fh
+
+
+def _write_lines(fd: int, lines: List[bytes]) -> None:
+    """Append a batch with one writev(2) where available, finishing any short write."""
+    if not hasattr(os, "writev"):  # pragma: no cover - non-POSIX
+        data = memoryview(b"".join(lines))
+        while data:
+            data = data[os.write(fd, data):]
+        return
+    while lines:
+        written = os.writev(fd, lines[:EVENTS_IOV_MAX])
+        # Drop fully written buffers and trim a partially written one.
+        for idx, line in enumerate(lines):
+            if written < len(line):
+                lines = [line[written:]] + lines[idx + 1:]
+                break
+            written -= len(line)
+        else:
+            lines = []
+
+
+def _events_writer_loop() -> None:
+    last_fsync = time.monotonic()
+    unsynced = False
+    while True:
+        try:
+            # With unsynced data pending, wake up in time to fsync it even if traffic stops.
+            first = _events_queue.get(timeout=EVENTS_FSYNC_SECONDS if unsynced else None)
+        except queue.Empty:
+            first = None
+        batch = [first] if first is not None else []
+        while batch and len(batch) < EVENTS_WRITE_BATCH:
+            try:
+                batch.append(_events_queue.get_nowait())
+            except queue.Empty:
+                break
+
+        # Queue items are pre-serialized lines, plus flush_events() barriers.
+        lines = [item for item in batch if type(item) is bytes]
+        try:
+            if lines:
+                with _events_write_lock, _events_flock():
+                    _write_lines(_events_handle().fileno(), lines)
+                unsynced = bool(EVENTS_FSYNC_SECONDS)
+            if unsynced and time.monotonic() - last_fsync >= EVENTS_FSYNC_SECONDS:
+                with _events_write_lock:
+                    # Only the handle the data went to; a handle closed since then was synced on close.
+                    if _events_fh is not None:
+                        os.fsync(_events_fh.fileno())
+                last_fsync = time.monotonic()
+                unsynced = False
+        except OSError:
+            app.logger.exception("Failed to write %d event(s) to %s", len(lines), EVENTS_FILE)
+        for item in batch:
+            if isinstance(item, threading.Event):
+                item.set()
+
+
+def _reset_events_cache(path: str) -> None:
+    _events_cache.update(
+        path=path,
+        key=None,
+        total=0,
+        opened_rows=[],
+        ack_rows=[],
+        offset=0,
+        ino=None,
+        mtime_ns=0,
+        user_stats={},
+        open_events=new_open_events(),
+    )
+    # Shared lock: never read the snapshot of a rotation still in progress.
+    with _events_write_lock, _events_flock():
+        _load_events_snapshot(path)
+
+
+def load_events(flush: bool = True) -> Tuple[Any, List[Markup], List[Markup]]:
+    """Return (cache_key, opened, acknowledged) for the events log, as dashboard rows.
+
+    Only lines appended since the previous call are parsed and folded into
+    the cached per-user aggregates; the file is re-read from the start if it
+    shrank, its mtime moved backwards or it is a different file (truncated, or
+    rotated by any worker). Once the log passes EVENTS_ROTATE_BYTES it is
+    rotated and the aggregates snapshotted. With `flush`, events still queued
+    for the writer are written out first.
+    """
+    if flush:
+        flush_events()
+    with _events_lock:
+        if _events_cache["path"] != EVENTS_FILE:
+            _reset_events_cache(EVENTS_FILE)
+        try:
+            st = os.stat(EVENTS_FILE)
+        except FileNotFoundError:
+            if _events_cache["ino"] is not None:
+                _reset_events_cache(EVENTS_FILE)
+            # No log yet (or just rotated): only snapshot aggregates, if any.
+            return (EVENTS_FILE, -1, _events_cache["total"]), _events_cache["opened_rows"], _events_cache["ack_rows"]
+
+        key = (EVENTS_FILE, st.st_size, st.st_mtime_ns)
+        if key != _events_cache["key"]:
+            if (
+                st.st_size < _events_cache["offset"]
+                or st.st_mtime_ns < _events_cache["mtime_ns"]
+                or _events_cache["ino"] not in (None, st.st_ino)
+            ):
+                _reset_events_cache(EVENTS_FILE)
+            _events_cache["ino"] = st.st_ino
+            _ingest_tail()
+            _events_cache["mtime_ns"] = st.st_mtime_ns
+            _events_cache["key"] = key
+            if _events_cache["offset"] >= EVENTS_ROTATE_BYTES:
+                _rotate_events_log()
+
+        return _events_cache["key"], _events_cache["opened_rows"], _events_cache["ack_rows"]
+
+
+def _ingest_tail() -> None:
+    offset = _events_cache["offset"]
+    try:
+        f = open(EVENTS_FILE, "rb")
+    except FileNotFoundError:
+        return
+    with f:
+        st = os.fstat(f.fileno())
+        # Rotated since load_events() looked; the next call starts over on the new file.
+        if st.st_ino != _events_cache["ino"] or st.st_size <= offset:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # Stop at the last complete line; a partially written record is picked up next time.
+            end = mm.rfind(b"\n", offset) + 1
+            # Parse in line-aligned windows so a cold start on a large log never
+            # copies the whole file out of the mapping at once.
+            while offset < end:
+                stop = mm.rfind(b"\n", offset, min(offset + EVENTS_INGEST_CHUNK, end)) + 1
+                if stop <= offset:  # a single line longer than the window
+                    stop = mm.find(b"\n", offset, end) + 1
+                _ingest_lines(mm[offset:stop].split(b"\n"))
+                offset = _events_cache["offset"] = stop
+
+
+def _ingest_lines(lines: List[bytes]) -> None:
+    # One pass per record: update the aggregates and route it to its table.
+    user_stats = _events_cache["user_stats"]
+    open_events = _events_cache["open_events"]
+    # Bound methods hoisted out of the loop; the dict picks the table in one lookup.
+    route = {
+        "opened": _events_cache["opened_rows"].append,
+        "acknowledged": _events_cache["ack_rows"].append,
+    }.get
+    loads = loads_event
+    apply = apply_event
+    total = 0
+    for line in lines:
+        if not line:
             continue
-        if normalized in seen:
+        # Decoded straight from bytes; surrounding whitespace is valid JSON and blank lines fail to parse.
+        try:
+            rec = loads(line)
+        except ValueError:
             continue
-        seen.add(normalized)
-        result.append(normalized)
-    return result
+        # A record of the wrong shape is skipped like a bad line: the offset only
+        # moves past the whole window, so raising here would make every retry
+        # apply the records before it again.
+        try:
+            append = route(rec.get("event"))
+            row = dashboard_row(rec) if append is not None else None
+            apply(user_stats, open_events, rec)
+        except (AttributeError, KeyError, TypeError, ValueError):
+            continue
+        total += 1
+        if append is not None:
+            append(row)
+    _events_cache["total"] += total
+
+
+_DASHBOARD_ROW_HTML = """<tr>
+          <td>{user}</td>
+          <td>{announcement_id}</td>
+          <td><code>{timestamp}</code></td>
+          <td><code title="{device}">{device_short}</code></td>
+          <td>{ip}</td>
+          <td>{link}</td>
+        </tr>
+"""
+_DASHBOARD_LINK_HTML = '<a href="{target}" target="_blank" rel="noopener">link</a>'
+
+
+def dashboard_row(rec: Dict[str, Any]) -> Markup:
+    """Render a record's dashboard table row once, at ingest, instead of on every request."""
+    device = rec.get("device") or ""
+    target = rec.get("target")
+    return Markup(
+        _DASHBOARD_ROW_HTML.format(
+            user=escape(rec.get("user", "")),
+            announcement_id=escape(rec.get("announcementId", "")),
+            timestamp=escape(rec.get("timestamp", "")),
+            device=escape(device),
+            device_short=escape(device[:60]),
+            ip=escape(rec.get("ip", "")),
+            link=_DASHBOARD_LINK_HTML.format(target=escape(target)) if target else "",
+        )
+    )
+
+
+def _rotate_events_log() -> None:
+    """Move the current log aside and snapshot the aggregates. Caller holds _events_lock.
+
+    The exclusive lock keeps every worker's writer out until the snapshot
+    covering the old log is written; if another worker rotated first, this
+    one restores from that snapshot instead.
+    """
+    with _events_write_lock, _events_flock(exclusive=True):
+        try:
+            rotated_away = os.stat(EVENTS_FILE).st_ino != _events_cache["ino"]
+        except FileNotFoundError:
+            rotated_away = True
+        if not rotated_away:
+            _close_events_fh()
+            # Fold in anything appended since the tail scan; no writer can add more now.
+            _ingest_tail()
+            stem = os.path.splitext(EVENTS_FILE)[0]
+            rotated = f"{stem}-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}.jsonl"
+            suffix = 1
+            while os.path.exists(rotated):
+                rotated = f"{stem}-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}-{suffix}.jsonl"
+                suffix += 1
+            try:
+                os.replace(EVENTS_FILE, rotated)
+            except FileNotFoundError:
+                rotated_away = True
+        if not rotated_away:
+            # Aggregates carry over; the tables start again with the new log.
+            _events_cache.update(key=None, offset=0, ino=None, mtime_ns=0, opened_rows=[], ack_rows=[])
+            _write_events_snapshot()
+    if rotated_away:
+        _reset_events_cache(EVENTS_FILE)
+
+
+def _write_events_snapshot() -> None:
+    snapshot = {
+        "log": EVENTS_FILE,
+        "offset": _events_cache["offset"],
+        "total": _events_cache["total"],
+        "user_stats": {
+            user: {
+                "open_count": stats["open_count"],
+                "ack_count": stats["ack_count"],
+                "ack_delays": stats["ack_delays"],
+                "last_event_ts": stats["last_event_ts"],
+                "targets": sorted(stats["targets"]),
+            }
+            for user, stats in _events_cache["user_stats"].items()
+        },
+        "open_events": [
+            [announcement_id, user, queue["ts"][queue["head"]:].tolist(), queue["targets"][queue["head"]:]]
+            for (announcement_id, user), queue in _events_cache["open_events"].items()
+            if queue["head"] < len(queue["ts"])
+        ],
+    }
+    tmp_path = EVENTS_SNAPSHOT_FILE + ".tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(dumps_event(snapshot))
+        os.replace(tmp_path, EVENTS_SNAPSHOT_FILE)
+    except OSError:
+        app.logger.exception("Failed to write events snapshot to %s", EVENTS_SNAPSHOT_FILE)
+
+
+def _load_events_snapshot(path: str) -> None:
+    try:
+        with open(EVENTS_SNAPSHOT_FILE, "rb") as f:
+            snapshot = loads_event(f.read())
+    except (OSError, ValueError):
+        return
+    if not isinstance(snapshot, dict) or snapshot.get("log") != path:
+        return
+
+    user_stats = _events_cache["user_stats"]
+    for user, stats in snapshot.get("user_stats", {}).items():
+        user_stats[user] = {
+            "open_count": stats["open_count"],
+            "ack_count": stats["ack_count"],
+            "ack_delays": list(stats["ack_delays"]),
+            "last_event_ts": stats["last_event_ts"],
+            "targets": set(stats["targets"]),
+        }
+    open_events = _events_cache["open_events"]
+    for announcement_id, user, timestamps, targets in snapshot.get("open_events", []):
+        queue = open_events[(announcement_id, user)]
+        queue["ts"].extend(timestamps)
+        queue["targets"].extend(targets)
+    _events_cache["total"] = snapshot.get("total", 0)
+    _events_cache["offset"] = snapshot.get("offset", 0)
+
+
+def _dedupe_preserve_order(values: Iterable[str]) -> List[str]:
+    # dict.fromkeys keeps first-seen order with a single hash per value.
+    return list(dict.fromkeys(value for value in (raw.strip() for raw in values) if value))
 
 
 def load_sms_recipients_from_file() -> List[str]:
@@ -78,17 +725,16 @@ def load_sms_recipients_from_file() -> List[str]:
         data = json.loads(content)
     except json.JSONDecodeError:
         data = None
-    numbers: List[str] = []
+    # _dedupe_preserve_order strips and drops empty entries itself.
     if isinstance(data, list):
-        numbers = [str(item).strip() for item in data if str(item).strip()]
-    elif isinstance(data, str):
-        numbers = [part.strip() for part in data.replace("\n", ",").split(",") if part.strip()]
-    else:
-        numbers = [part.strip() for part in content.replace("\n", ",").split(",") if part.strip()]
-    return _dedupe_preserve_order(numbers)
+        return _dedupe_preserve_order(str(item) for item in data)
+    if isinstance(data, str):
+        return _dedupe_preserve_order(data.replace("\n", ",").split(","))
+    return _dedupe_preserve_order(content.replace("\n", ",").split(","))
 
 
 def save_sms_recipients(raw_numbers: str) -> List[str]:
+    global _recipients_version
     flattened = raw_numbers.replace("\n", ",")
     numbers = _dedupe_preserve_order(flattened.split(","))
     if numbers:
@@ -97,6 +743,7 @@ def save_sms_recipients(raw_numbers: str) -> List[str]:
     else:
         if os.path.exists(SMS_RECIPIENTS_FILE):
             os.remove(SMS_RECIPIENTS_FILE)
+    _recipients_version += 1
     return numbers
 
 
@@ -108,8 +755,33 @@ def get_env_sms_recipients() -> List[str]:
 
 
 def get_sms_recipients() -> List[str]:
-    numbers = load_sms_recipients_from_file() + get_env_sms_recipients()
-    return _dedupe_preserve_order(numbers)
+    return _refresh_recipients_cache()["value"]
+
+
+def sms_recipients_snapshot() -> Tuple[str, List[str]]:
+    """Return (file numbers joined one per line, env numbers) for the dashboard form."""
+    cache = _refresh_recipients_cache()
+    return cache["joined"], cache["env"]
+
+
+def _refresh_recipients_cache() -> Dict[str, Any]:
+    # Re-parse only when the recipients file, the env value, or a save changes them.
+    try:
+        st = os.stat(SMS_RECIPIENTS_FILE)
+        file_key: Optional[Tuple[int, int]] = (st.st_mtime_ns, st.st_size)
+    except OSError:
+        file_key = None
+    key = (SMS_RECIPIENTS_FILE, file_key, os.environ.get("SMS_RECIPIENTS", ""), _recipients_version)
+    if _recipients_cache["key"] != key:
+        file_numbers = load_sms_recipients_from_file()
+        env_numbers = get_env_sms_recipients()
+        _recipients_cache.update(
+            value=_dedupe_preserve_order(itertools.chain(file_numbers, env_numbers)),
+            joined="\n".join(file_numbers),
+            env=env_numbers,
+            key=key,
+        )
+    return _recipients_cache
 
 
 def get_twilio_client() -> Optional[Client]:
@@ -119,18 +791,32 @@ def get_twilio_client() -> Optional[Client]:
     auth_token = os.environ.get("TWILIO_AUTH_TOKEN")
     if not account_sid or not auth_token:
         return None
-    try:
-        return Client(account_sid, auth_token)
-    except Exception:
-        return None
+    key = (account_sid, auth_token)
+    if _twilio_client_cache["key"] != key:
+        try:
+            # One pooled session so concurrent sends reuse TCP/TLS connections to the Twilio API.
+            http_client = TwilioHttpClient(pool_connections=True)
+            http_client.session.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=32))
+            client = Client(account_sid, auth_token, http_client=http_client)
+        except Exception:
+            return None
+        _twilio_client_cache["client"] = client
+        _twilio_client_cache["key"] = key
+    return _twilio_client_cache["client"]
 
 
 def send_sms_alert(event: Dict[str, Any], announcement: Optional[Dict[str, Any]]) -> None:
     client = get_twilio_client()
     if client is None:
         return
+    # A Messaging Service picks the sender itself, so it replaces the fixed from number.
+    messaging_service_sid = os.environ.get("TWILIO_MESSAGING_SERVICE_SID")
     from_number = os.environ.get("TWILIO_FROM_NUMBER")
-    if not from_number:
+    if messaging_service_sid:
+        sender = {"messaging_service_sid": messaging_service_sid}
+    elif from_number:
+        sender = {"from_": from_number}
+    else:
         return
     recipients = get_sms_recipients()
     if not recipients:
@@ -153,11 +839,35 @@ def send_sms_alert(event: Dict[str, Any], announcement: Optional[Dict[str, Any]]
         message_lines.append(f"Target: {target}")
     body = "\n".join(message_lines)
 
-    for number in recipients:
+    def send(number: str) -> None:
         try:
-            client.messages.create(to=number, from_=from_number, body=body)
+            client.messages.create(to=number, body=body, **sender)
         except Exception:
-            continue
+            pass
+
+    # Each create() is a blocking HTTPS round-trip, so send to recipients concurrently.
+    list(_sms_sender_pool().map(send, recipients))
+
+
+def _sms_sender_pool() -> ThreadPoolExecutor:
+    global _sms_pool
+    if _sms_pool is None:
+        _sms_pool = ThreadPoolExecutor(max_workers=SMS_SEND_WORKERS, thread_name_prefix="sms-send")
+    return _sms_pool
+
+
+def queue_sms_alert(event: Dict[str, Any], announcement: Optional[Dict[str, Any]]) -> None:
+    _ensure_background_thread("sms-worker", _sms_worker_loop)
+    _sms_queue.put_nowait((event, announcement))
+
+
+def _sms_worker_loop() -> None:
+    while True:
+        event, announcement = _sms_queue.get()
+        try:
+            send_sms_alert(event, announcement)
+        except Exception:
+            app.logger.exception("Failed to send SMS alert for %s event", event.get("event"))
 
 
 def normalize_user(value: Optional[str]) -> str:
@@ -176,116 +886,254 @@ def parse_iso_timestamp(value: Optional[str]) -> Optional[datetime]:
         return None
 
 
-def build_user_stats(events: List[Dict[str, Any]]) -> Tuple[Dict[str, Any], Dict[str, List[Dict[str, Any]]]]:
-    user_stats: Dict[str, Dict[str, Any]] = {}
-    open_events: Dict[Tuple[Optional[str], str], deque] = defaultdict(deque)
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+_day_start_seconds: Dict[Tuple[int, int, int], int] = {}
 
-    for event in events:
-        event_type = event.get("event")
-        announcement_id = event.get("announcementId")
-        user = normalize_user(event.get("user"))
-        timestamp = parse_iso_timestamp(event.get("timestamp"))
-        target = event.get("target") or ""
-
-        stats = user_stats.setdefault(
-            user,
-            {
-                "open_count": 0,
-                "ack_count": 0,
-                "ack_delays": [],
-                "last_event_ts": None,
-                "targets": set(),
-            },
-        )
 
-        if timestamp and (stats["last_event_ts"] is None or timestamp > stats["last_event_ts"]):
-            stats["last_event_ts"] = timestamp
-        if target:
-            stats["targets"].add(target)
-
-        key = (announcement_id, user)
-
-        if event_type == "opened":
-            stats["open_count"] += 1
-            if timestamp is not None:
-                open_events[key].append(
-                    {
-                        "timestamp": timestamp,
-                        "target": target,
-                        "announcementId": announcement_id,
-                    }
-                )
-        elif event_type == "acknowledged":
-            stats["ack_count"] += 1
-            if timestamp is not None and open_events[key]:
-                opened_event = open_events[key].popleft()
-                opened_ts = opened_event.get("timestamp")
-                if opened_ts and timestamp >= opened_ts:
-                    delay_seconds = (timestamp - opened_ts).total_seconds()
-                    stats["ack_delays"].append(delay_seconds)
+def _fast_iso_epoch(value: str) -> Optional[float]:
+    """Epoch seconds for iso_utc_now()'s own "YYYY-MM-DDTHH:MM:SS[.ffffff]Z" format, else None."""
+    # isdigit() below also accepts non-ASCII digits such as "²", which int() rejects.
+    if not value.isascii():
+        return None
+    length = len(value)
+    if length == 27 and value[19] == "." and value[20:26].isdigit():
+        micros = int(value[20:26])
+    elif length == 20:
+        micros = 0
+    else:
+        return None
+    if value[-1] != "Z" or value[4] != "-" or value[7] != "-" or value[10] != "T" or value[13] != ":" or value[16] != ":":
+        return None
+    digits = value[0:4] + value[5:7] + value[8:10] + value[11:13] + value[14:16] + value[17:19]
+    if not digits.isdigit():
+        return None
+    hour, minute, second = int(value[11:13]), int(value[14:16]), int(value[17:19])
+    if hour > 23 or minute > 59 or second > 59:
+        return None
+    ymd = (int(value[0:4]), int(value[5:7]), int(value[8:10]))
+    day_start = _day_start_seconds.get(ymd)
+    if day_start is None:
+        # Most events on a given day share this lookup.
+        try:
+            day_start = (date(*ymd).toordinal() - _EPOCH_ORDINAL) * 86400
+        except ValueError:
+            return None
+        _day_start_seconds[ymd] = day_start
+    # Same integer-microseconds division as datetime.timestamp(), so both paths agree exactly.
+    return ((day_start + hour * 3600 + minute * 60 + second) * 1_000_000 + micros) / 1_000_000
+
+
+def event_epoch(event: Dict[str, Any]) -> Optional[float]:
+    # Events written since "ts" was added carry epoch seconds; older records only have the ISO string.
+    ts = event.get("ts")
+    if isinstance(ts, (int, float)):
+        return float(ts)
+    value = event.get("timestamp")
+    if isinstance(value, str):
+        fast = _fast_iso_epoch(value)
+        if fast is not None:
+            return fast
+    parsed = parse_iso_timestamp(value)
+    if parsed is None:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
 
+def _new_open_queue() -> Dict[str, Any]:
+    # FIFO of unacknowledged open timestamps (with their targets); "head" indexes the oldest.
+    return {"ts": array("d"), "targets": [], "head": 0}
+
+
+def new_open_events() -> Dict[Tuple[Any, str], Dict[str, Any]]:
+    return defaultdict(_new_open_queue)
+
+
+def apply_event(
+    user_stats: Dict[str, Dict[str, Any]],
+    open_events: Dict[Tuple[Any, str], Dict[str, Any]],
+    event: Dict[str, Any],
+) -> None:
+    event_type = event.get("event")
+    announcement_id = event.get("announcementId")
+    user = normalize_user(event.get("user"))
+    timestamp = event_epoch(event)
+    target = event.get("target") or ""
+
+    stats = user_stats.setdefault(
+        user,
+        {
+            "open_count": 0,
+            "ack_count": 0,
+            "ack_delays": [],
+            "last_event_ts": None,
+            "targets": set(),
+        },
+    )
+
+    if timestamp is not None and (stats["last_event_ts"] is None or timestamp > stats["last_event_ts"]):
+        stats["last_event_ts"] = timestamp
+    if target:
+        stats["targets"].add(target)
+
+    key = (announcement_id, user)
+
+    if event_type == "opened":
+        stats["open_count"] += 1
+        if timestamp is not None:
+            queue = open_events[key]
+            queue["ts"].append(timestamp)
+            queue["targets"].append(target)
+    elif event_type == "acknowledged":
+        stats["ack_count"] += 1
+        queue = open_events.get(key)
+        if timestamp is not None and queue is not None and queue["head"] < len(queue["ts"]):
+            opened_ts = queue["ts"][queue["head"]]
+            queue["head"] += 1
+            if timestamp >= opened_ts:
+                stats["ack_delays"].append(timestamp - opened_ts)
+            # Drop the consumed prefix once it is at least half the buffer.
+            head = queue["head"]
+            if head == len(queue["ts"]) or (head >= 64 and head * 2 >= len(queue["ts"])):
+                del queue["ts"][:head], queue["targets"][:head]
+                queue["head"] = 0
+
+
+def outstanding_opens(open_events: Dict[Tuple[Any, str], Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
     outstanding_by_user: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
     for (announcement_id, user), queue in open_events.items():
-        while queue:
-            opened_event = queue.popleft()
+        head = queue["head"]
+        for opened_at, target in zip(queue["ts"][head:], queue["targets"][head:]):
             outstanding_by_user[user].append(
                 {
                     "announcementId": announcement_id,
-                    "opened_at": opened_event.get("timestamp"),
-                    "target": opened_event.get("target"),
+                    "opened_at": opened_at,
+                    "target": target,
                 }
             )
+    return outstanding_by_user
+
+
+def build_user_stats(events: List[Dict[str, Any]]) -> Tuple[Dict[str, Any], Dict[str, List[Dict[str, Any]]]]:
+    user_stats: Dict[str, Dict[str, Any]] = {}
+    open_events = new_open_events()
+
+    for event in events:
+        apply_event(user_stats, open_events, event)
+
+    return user_stats, outstanding_opens(open_events)
 
-    return user_stats, outstanding_by_user
 
+def _score_kernel(opens, acks, avg_delay_sec, ack_rate, delay_minutes, outstanding, scores, risks):  # type: ignore[no-untyped-def]
+    # Engagement and risk scores for every user in one pass. Missing delays are passed as -1.
+    # Written against plain indexing so it runs both under numba and on Python lists.
+    for i in range(len(opens)):
+        raw_ack_rate = acks[i] / opens[i] if opens[i] else 0.0
+        avg_delay_hours = avg_delay_sec[i] / 3600 if avg_delay_sec[i] >= 0 else 12.0
+        delay_score = max(0.0, min(1.0, 1 - (avg_delay_hours / 24)))
+        activity = min(opens[i] + acks[i], 20.0) / 20
+        scores[i] = (0.6 * raw_ack_rate) + (0.25 * delay_score) + (0.15 * activity)
+
+        risk_delay_hours = (delay_minutes[i] if delay_minutes[i] > 0 else 90.0) / 60
+        if ack_rate[i] < 0.6 or outstanding[i]:
+            risks[i] = (1 - ack_rate[i]) + min(outstanding[i], 3.0) * 0.2 + min(risk_delay_hours / 12, 1.0)
+        else:
+            risks[i] = -1.0
 
-def calculate_engagement_score(stats: Dict[str, Any]) -> float:
-    opens = stats.get("open_count", 0)
-    acks = stats.get("ack_count", 0)
-    ack_rate = acks / opens if opens else 0.0
-    delays = stats.get("ack_delays", [])
-    avg_delay_hours = mean(delays) / 3600 if delays else 12.0
-    delay_score = max(0.0, min(1.0, 1 - (avg_delay_hours / 24)))
-    activity = min(opens + acks, 20) / 20
-    return round((0.6 * ack_rate) + (0.25 * delay_score) + (0.15 * activity), 4)
+
+_score_kernel_jit = None
+if njit is not None and np is not None:
+    try:
+        _score_kernel_jit = njit(cache=True)(_score_kernel)
+        # Compile at import so the first dashboard render does not pay for it.
+        _score_kernel_jit(*([np.zeros(1)] * 8))
+    except Exception:  # pragma: no cover - numba/numpy version mismatch
+        _score_kernel_jit = None
+
+
+def score_users(
+    opens: List[float],
+    acks: List[float],
+    avg_delay_sec: List[float],
+    ack_rate: List[float],
+    delay_minutes: List[float],
+    outstanding: List[float],
+) -> Tuple[List[float], List[float]]:
+    """Return (engagement scores, risk scores) per user; a risk score of -1 means not at risk."""
+    if _score_kernel_jit is not None:
+        columns = [np.asarray(column, dtype=np.float64) for column in (opens, acks, avg_delay_sec, ack_rate, delay_minutes, outstanding)]
+        scores_arr = np.empty(len(opens))
+        risks_arr = np.empty(len(opens))
+        _score_kernel_jit(*columns, scores_arr, risks_arr)
+        return scores_arr.tolist(), risks_arr.tolist()
+    scores = [0.0] * len(opens)
+    risks = [0.0] * len(opens)
+    _score_kernel(opens, acks, avg_delay_sec, ack_rate, delay_minutes, outstanding, scores, risks)
+    return scores, risks
 
 
 def profile_users(user_stats: Dict[str, Any], outstanding: Dict[str, List[Dict[str, Any]]]) -> Tuple[Dict[str, Dict[str, Any]], str]:
     profiles: Dict[str, Dict[str, Any]] = {}
-    features: List[List[float]] = []
-    ordered_users: List[str] = []
-
-    for user, stats in user_stats.items():
-        opens = stats.get("open_count", 0)
-        acks = stats.get("ack_count", 0)
-        ack_rate = acks / opens if opens else 0.0
-        delays = stats.get("ack_delays", [])
-        avg_delay_minutes = mean(delays) / 60 if delays else None
-        score = calculate_engagement_score(stats)
+    ordered_users: List[str] = list(user_stats)
+    opens_list = [stats.get("open_count", 0) for stats in user_stats.values()]
+    acks_list = [stats.get("ack_count", 0) for stats in user_stats.values()]
+    avg_delays = [mean(stats["ack_delays"]) if stats.get("ack_delays") else None for stats in user_stats.values()]
+
+    features: Any = None
+    if np is not None:
+        # Build the (users x 4) feature matrix column-wise instead of row by row.
+        opens_arr = np.asarray(opens_list, dtype=np.float64)
+        acks_arr = np.asarray(acks_list, dtype=np.float64)
+        ack_rate_arr = np.divide(acks_arr, opens_arr, out=np.zeros_like(acks_arr), where=opens_arr > 0)
+        delay_hours = np.array([delay / 3600 if delay is not None else np.nan for delay in avg_delays], dtype=np.float64)
+        features = np.column_stack((opens_arr, acks_arr, ack_rate_arr, np.where(np.isnan(delay_hours), 0.5, delay_hours)))
+        ack_rates = ack_rate_arr.tolist()
+    else:
+        ack_rates = [acks / opens if opens else 0.0 for opens, acks in zip(opens_list, acks_list)]
+
+    ack_rate_pcts = [round(rate * 100, 1) for rate in ack_rates]
+    avg_delay_minutes = [round(delay / 60, 1) if delay is not None else None for delay in avg_delays]
+    outstanding_counts = [len(outstanding.get(user, [])) for user in ordered_users]
+    # Risk scoring works from the same rounded figures the dashboard displays.
+    scores, risks = score_users(
+        opens_list,
+        acks_list,
+        [delay if delay is not None else -1.0 for delay in avg_delays],
+        [pct / 100 for pct in ack_rate_pcts],
+        [minutes or 0.0 for minutes in avg_delay_minutes],
+        outstanding_counts,
+    )
+
+    for idx, user in enumerate(ordered_users):
         profiles[user] = {
-            "opens": opens,
-            "acks": acks,
-            "ack_rate": round(ack_rate * 100, 1),
-            "avg_delay_minutes": round(avg_delay_minutes, 1) if avg_delay_minutes is not None else None,
-            "score": score,
+            "opens": opens_list[idx],
+            "acks": acks_list[idx],
+            "ack_rate": ack_rate_pcts[idx],
+            "avg_delay_minutes": avg_delay_minutes[idx],
+            "score": round(scores[idx], 4),
             "classification": "",
-            "outstanding": len(outstanding.get(user, [])),
+            "outstanding": outstanding_counts[idx],
+            "risk_score": round(risks[idx], 3) if risks[idx] >= 0 else None,
         }
 
-        feature_vector = [
-            float(opens),
-            float(acks),
-            ack_rate,
-            (avg_delay_minutes / 60) if avg_delay_minutes is not None else 0.5,
-        ]
-        features.append(feature_vector)
-        ordered_users.append(user)
-
     engine = "heuristic"
-    if KMeans is not None and len(features) >= 3:
+    if (MiniBatchKMeans is not None or KMeans is not None) and features is not None and len(ordered_users) >= 3:
         try:
-            n_clusters = min(3, len(features))
-            model = KMeans(n_clusters=n_clusters, n_init=10, random_state=0)
+            n_clusters = min(3, len(ordered_users))
+            if MiniBatchKMeans is not None:
+                model = MiniBatchKMeans(
+                    n_clusters=n_clusters,
+                    batch_size=min(256, len(ordered_users)),
+                    n_init=3,
+                    max_iter=50,
+                    random_state=0,
+                )
+                model_engine = "sklearn-minibatch-kmeans"
+            else:
+                # The feature set is tiny and seeded, so a single Elkan run is enough.
+                model = KMeans(n_clusters=n_clusters, n_init=1, algorithm="elkan", random_state=0)
+                model_engine = "sklearn-kmeans"
             labels = model.fit_predict(features)
             cluster_scores: Dict[int, float] = defaultdict(float)
             cluster_counts: Dict[int, int] = defaultdict(int)
@@ -307,7 +1155,7 @@ def profile_users(user_stats: Dict[str, Any], outstanding: Dict[str, List[Dict[s
             for idx, user in enumerate(ordered_users):
                 label = labels[idx]
                 profiles[user]["classification"] = mapping.get(label, "Steady")
-            engine = "sklearn-kmeans"
+            engine = model_engine
         except Exception:
             engine = "heuristic"
 
@@ -325,10 +1173,65 @@ def profile_users(user_stats: Dict[str, Any], outstanding: Dict[str, List[Dict[s
     return profiles, engine
 
 
+def cached_user_analytics(key: Any) -> Dict[str, Any]:
+    # Built from the incrementally maintained aggregates in _events_cache, memoized on the log's cache key.
+    with _events_lock:
+        if key is not None and _analytics_cache["key"] == key:
+            return _analytics_cache["value"]
+        # Copy just what the summary reads, so ingest and dashboard reads are not
+        # held up while users are scored and clustered.
+        total = _events_cache["total"]
+        user_stats = {
+            user: {"open_count": stats["open_count"], "ack_count": stats["ack_count"], "ack_delays": list(stats["ack_delays"])}
+            for user, stats in _events_cache["user_stats"].items()
+        }
+        outstanding = outstanding_opens(_events_cache["open_events"])
+    value = summarize_user_analytics(total, user_stats, outstanding)
+    with _events_lock:
+        _analytics_cache["value"] = value
+        _analytics_cache["key"] = key
+    return value
+
+
+def latest_user_analytics(key: Any) -> Dict[str, Any]:
+    """Return the most recent analytics for the current log without recomputing on the request path.
+
+    The background refresher keeps the value current; it is only computed
+    inline when nothing has been computed yet for this log.
+    """
+    _ensure_background_thread("analytics-refresher", _analytics_refresher_loop)
+    value = _analytics_cache["value"]
+    cached_key = _analytics_cache["key"]
+    if value is None or cached_key is None or key is None or cached_key[0] != key[0]:
+        return cached_user_analytics(key)
+    return value
+
+
+def _analytics_refresher_loop() -> None:
+    while True:
+        time.sleep(ANALYTICS_REFRESH_SECONDS)
+        try:
+            key, _, _ = load_events()
+            cached_user_analytics(key)
+        except Exception:
+            app.logger.exception("Background analytics refresh failed")
+
+
 def generate_user_analytics(events: List[Dict[str, Any]]) -> Dict[str, Any]:
+    if not events:
+        return summarize_user_analytics(0, {}, {})
+    user_stats, outstanding = build_user_stats(events)
+    return summarize_user_analytics(len(events), user_stats, outstanding)
+
+
+def summarize_user_analytics(
+    total_events: int,
+    user_stats: Dict[str, Any],
+    outstanding: Dict[str, List[Dict[str, Any]]],
+) -> Dict[str, Any]:
     analytics = {
         "overall": {
-            "total_events": len(events),
+            "total_events": total_events,
             "total_users": 0,
             "conversion_rate": 0.0,
             "avg_ack_minutes": None,
@@ -339,11 +1242,10 @@ def generate_user_analytics(events: List[Dict[str, Any]]) -> Dict[str, Any]:
         "engine": "heuristic",
     }
 
-    if not events:
+    if not total_events:
         analytics["insights"].append("No engagement events recorded yet. Ask users to open and acknowledge announcements to gather data.")
         return analytics
 
-    user_stats, outstanding = build_user_stats(events)
     profiles, engine = profile_users(user_stats, outstanding)
     analytics["engine"] = engine
 
@@ -381,19 +1283,15 @@ def generate_user_analytics(events: List[Dict[str, Any]]) -> Dict[str, Any]:
 
     risk_candidates = []
     for user, profile in profiles.items():
-        ack_rate = profile["ack_rate"] / 100 if profile["ack_rate"] is not None else 0.0
-        avg_delay_hours = (profile["avg_delay_minutes"] or 90) / 60
-        outstanding_tasks = profile["outstanding"]
-        if ack_rate < 0.6 or outstanding_tasks:
-            risk_score = (1 - ack_rate) + min(outstanding_tasks, 3) * 0.2 + min(avg_delay_hours / 12, 1)
+        if profile["risk_score"] is not None:
             risk_candidates.append(
                 {
                     "user": user,
-                    "ack_rate": round(ack_rate * 100, 1),
-                    "outstanding": outstanding_tasks,
+                    "ack_rate": profile["ack_rate"],
+                    "outstanding": profile["outstanding"],
                     "avg_delay_minutes": profile["avg_delay_minutes"],
                     "classification": profile["classification"],
-                    "risk_score": round(risk_score, 3),
+                    "risk_score": profile["risk_score"],
                 }
             )
 
@@ -414,30 +1312,66 @@ def generate_user_analytics(events: List[Dict[str, Any]]) -> Dict[str, Any]:
     return analytics
 
 
+if msgspec is not None:
+
+    class NewAnnouncement(msgspec.Struct):
+        # Body of POST /announcement; unknown keys are ignored.
+        title: str
+        details: str
+        target: str
+
+    _decode_new_announcement = msgspec.json.Decoder(NewAnnouncement).decode
+
+
+# Targets end up as links on the track page, so only plain web URLs are accepted.
+_HTTP_URL = re.compile(r"https?://[^\s/]", re.IGNORECASE)
+# request.host_url without the trailing slash, per host (client-controlled, so bounded).
+BASE_URL_CACHE_MAX_HOSTS = 64
+_base_urls: Dict[str, str] = {}
+
+
+def _base_url() -> str:
+    host_url = request.host_url
+    base = _base_urls.get(host_url)
+    if base is None:
+        if len(_base_urls) >= BASE_URL_CACHE_MAX_HOSTS:
+            _base_urls.clear()
+        base = _base_urls[host_url] = host_url.rstrip("/")
+    return base
+
+
+def _new_announcement_fields() -> Tuple[Any, Any, Any]:
+    # msgspec decodes and type-checks the raw body in one C pass; a bad body
+    # yields empty fields so the caller's "missing fields" 400 applies.
+    if msgspec is not None and request.is_json:
+        try:
+            payload = _decode_new_announcement(request.get_data(cache=False))
+        except msgspec.DecodeError:
+            return None, None, None
+        return payload.title, payload.details, payload.target
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return None, None, None
+    # Same contract as the Struct: anything but a string counts as missing.
+    title, details, target = (
+        value if isinstance(value, str) else None for value in (data.get("title"), data.get("details"), data.get("target"))
+    )
+    return title, details, target
+
+
 @app.post("/announcement")
 def create_announcement():
-    global next_announcement_id
-    data = request.get_json(silent=True) or {}
-    title = data.get("title")
-    details = data.get("details")
-    target = data.get("target")
+    title, details, target = _new_announcement_fields()
 
     if not title or not details or not target:
         return jsonify({"error": "Missing required fields: title, details, target"}), 400
+    if not _HTTP_URL.match(target):
+        return jsonify({"error": "target must be an http(s) URL"}), 400
 
-    ann = {
-        "id": next_announcement_id,
-        "title": title,
-        "details": details,
-        "target": target,
-        "createdAt": iso_utc_now(),
-    }
-    announcements.append(ann)
-    next_announcement_id += 1
+    ann = store_announcement(title, details, target)
 
-    # Build tracking link: http://localhost:5000/track?id=123&target=https://example.com
-    base = request.host_url.rstrip("/")
-    tracking_link = f"{base}/track?id={ann['id']}&target={target}"
+    # Build tracking link: http://localhost:5000/track?id=123&target=https%3A%2F%2Fexample.com
+    tracking_link = f"{_base_url()}/track?{urlencode({'id': ann['id'], 'target': target})}"
 
     return jsonify({
         "announcement": ann,
@@ -445,6 +1379,87 @@ def create_announcement():
     }), 201
 
 
+# Interstitial pages only interpolate a few escaped scalars, so they are plain
+# str.format templates (CSS braces doubled) rather than Jinja templates.
+TRACK_HTML = """
+<!doctype html>
+<html>
+  <head>
+    <meta charset="utf-8" />
+    <meta name="viewport" content="width=device-width, initial-scale=1" />
+    <title>Announcement</title>
+    <style>
+      body {{ font-family: system-ui, -apple-system, Segoe UI, Roboto, sans-serif; margin: 2rem; }}
+      .card {{ border: 1px solid #ddd; border-radius: 8px; padding: 1rem 1.25rem; max-width: 800px; margin-bottom: 1.5rem; }}
+      .actions {{ margin-top: 1.25rem; display: flex; flex-direction: column; gap: 0.5rem; }}
+      .btn {{ display: inline-flex; align-items: center; justify-content: center; padding: 0.6rem 1.2rem; border-radius: 6px; background: #2e6bff; color: white; text-decoration: none; font-weight: 600; width: fit-content; }}
+      .note {{ color: #555; font-size: 0.9rem; }}
+      form {{ display: grid; gap: 0.5rem; max-width: 420px; }}
+      input[type=text] {{ padding: 0.5rem; border: 1px solid #ccc; border-radius: 6px; }}
+      button {{ padding: 0.5rem 1rem; border: 0; border-radius: 6px; background: #2e6bff; color: white; cursor: pointer; }}
+      label {{ font-weight: 600; }}
+      .meta {{ color: #666; font-size: 0.9rem; }}
+    </style>
+  </head>
+  <body>
+    <div class="card">
+      <h2>{title}</h2>
+      <p class="meta">Announcement ID: {announcement_id}</p>
+      <p>{details}</p>
+{target_block}    </div>
+
+    <div class="card">
+      <h3>Acknowledge Completion</h3>
+      <p class="meta">Record your acknowledgement after finishing the task.</p>
+      <form method="post" action="/acknowledge">
+        <label for="user">Username</label>
+        <input id="user" name="user" type="text" placeholder="employee@example.com" value="{default_user}" required />
+        <input type="hidden" name="announcementId" value="{announcement_id}" />
+        <input type="hidden" name="target" value="{target_url}" />
+        <button type="submit">Acknowledge</button>
+      </form>
+    </div>
+  </body>
+</html>
+"""
+_TRACK_TARGET_HTML = """      <div class="actions">
+        <a class="btn" href="{target_url}" target="_blank" rel="noopener">Start Task</a>
+        <p class="note">The task opens in a new tab. Once you have completed it, return here to acknowledge.</p>
+      </div>
+"""
+_TRACK_NO_TARGET_HTML = """      <p class="meta">This announcement does not have a target URL configured.</p>
+"""
+# Rendered track pages kept per process (bounded: target and user come from the query)
+TRACK_PAGE_CACHE_SIZE = 512
+
+
+def html_response(page: Union[str, bytes], gz: Optional[bytes] = None) -> Response:
+    # Pages come from the track LRU or are constants, so their gzip bodies are cached
+    # too; a preset Content-Encoding also makes flask-compress leave the body alone.
+    if request.accept_encodings["gzip"] > 0:
+        response = Response(gz if gz is not None else _gzip_page(page), mimetype="text/html")
+        response.headers["Content-Encoding"] = "gzip"
+    else:
+        response = Response(page, mimetype="text/html")
+    response.headers["Vary"] = "Accept-Encoding"
+    return response
+
+
+@lru_cache(maxsize=TRACK_PAGE_CACHE_SIZE + 1)
+def _gzip_page(page: str) -> bytes:
+    return gzip.compress(page.encode("utf-8"), compresslevel=6, mtime=0)
+
+
+# Longest accepted id; also keeps int() clear of its 4300-digit conversion limit.
+MAX_ID_DIGITS = 18
+
+
+def _is_plain_int(raw: str) -> bool:
+    # Ids are unsigned ASCII digits; a str check is cheaper than int() inside try/except.
+    # isascii() matters: isdigit() alone also accepts characters like "²" that int() rejects.
+    return len(raw) <= MAX_ID_DIGITS and raw.isascii() and raw.isdigit()
+
+
 @app.get("/track")
 def track_open():
     # Parameters
@@ -453,93 +1468,61 @@ def track_open():
     user = request.args.get("user") or request.args.get("username") or "anonymous"
 
     # Normalize/validate id
-    try:
-        announcement_id = int(ann_id) if ann_id is not None else None
-    except ValueError:
+    if ann_id is None:
+        announcement_id = None
+    elif _is_plain_int(ann_id):
+        announcement_id = int(ann_id)
+    else:
         return ("Invalid id", 400)
 
     # Find announcement details if available
-    ann = None
-    if announcement_id is not None:
-        for a in announcements:
-            if a["id"] == announcement_id:
-                ann = a
-                break
+    ann = get_announcement(announcement_id)
 
-    device = request.headers.get("User-Agent", "")
+    ip, device = request_origin()
+    timestamp, epoch = utc_now_with_epoch()
     event = {
         "event": "opened",
         "announcementId": announcement_id,
         "user": user,
         "target": target,
-        "timestamp": iso_utc_now(),
+        "timestamp": timestamp,
+        "ts": epoch,
         "device": device,
-        "ip": client_ip(),
+        "ip": ip,
     }
     append_event(event)
-    send_sms_alert(event, ann)
+    queue_sms_alert(event, ann)
 
     prefill_user = request.args.get("user") or request.args.get("username") or ""
 
     # Render announcement details along with direct link to the task and an acknowledgement form
-    html = """
-    <!doctype html>
-    <html>
-      <head>
-        <meta charset="utf-8" />
-        <meta name="viewport" content="width=device-width, initial-scale=1" />
-        <title>Announcement</title>
-        <style>
-          body { font-family: system-ui, -apple-system, Segoe UI, Roboto, sans-serif; margin: 2rem; }
-          .card { border: 1px solid #ddd; border-radius: 8px; padding: 1rem 1.25rem; max-width: 800px; margin-bottom: 1.5rem; }
-          .actions { margin-top: 1.25rem; display: flex; flex-direction: column; gap: 0.5rem; }
-          .btn { display: inline-flex; align-items: center; justify-content: center; padding: 0.6rem 1.2rem; border-radius: 6px; background: #2e6bff; color: white; text-decoration: none; font-weight: 600; width: fit-content; }
-          .note { color: #555; font-size: 0.9rem; }
-          form { display: grid; gap: 0.5rem; max-width: 420px; }
-          input[type=text] { padding: 0.5rem; border: 1px solid #ccc; border-radius: 6px; }
-          button { padding: 0.5rem 1rem; border: 0; border-radius: 6px; background: #2e6bff; color: white; cursor: pointer; }
-          label { font-weight: 600; }
-          .meta { color: #666; font-size: 0.9rem; }
-        </style>
-      </head>
-      <body>
-        <div class="card">
-          <h2>{{ title }}</h2>
-          <p class="meta">Announcement ID: {{ announcement_id }}</p>
-          <p>{{ details }}</p>
-          {% if target_url %}
-          <div class="actions">
-            <a class="btn" href="{{ target_url }}" target="_blank" rel="noopener">Start Task</a>
-            <p class="note">The task opens in a new tab. Once you have completed it, return here to acknowledge.</p>
-          </div>
-          {% else %}
-          <p class="meta">This announcement does not have a target URL configured.</p>
-          {% endif %}
-        </div>
+    return html_response(render_track_page(announcement_id, ann, target, prefill_user if prefill_user != "anonymous" else ""))
 
-        <div class="card">
-          <h3>Acknowledge Completion</h3>
-          <p class="meta">Record your acknowledgement after finishing the task.</p>
-          <form method="post" action="/acknowledge">
-            <label for="user">Username</label>
-            <input id="user" name="user" type="text" placeholder="employee@example.com" value="{{ default_user }}" required />
-            <input type="hidden" name="announcementId" value="{{ announcement_id }}" />
-            <input type="hidden" name="target" value="{{ target_url }}" />
-            <button type="submit">Acknowledge</button>
-          </form>
-        </div>
-      </body>
-    </html>
-    """
 
-    return render_template_string(
-        html,
-        announcement_id=announcement_id,
-        title=(ann["title"] if ann else "Announcement"),
-        details=(ann["details"] if ann else "Please proceed to complete the task."),
-        target_url=target or (ann["target"] if ann else ""),
-        default_user=prefill_user if prefill_user != "anonymous" else "",
-    )
+def render_track_page(
+    announcement_id: Optional[int], ann: Optional[Dict[str, Any]], target: Optional[str], default_user: str
+) -> str:
+    if ann is None:
+        title, details, ann_target = "Announcement", "Please proceed to complete the task.", ""
+    else:
+        title, details, ann_target = ann["title"], ann["details"], ann["target"]
+    return _render_track_page(announcement_id, title, details, target or ann_target, default_user)
+
+
+# Keyed on the rendered content rather than just the id, so a reused or late-created
+# id can never serve a stale page; repeat clicks on a share link hit the cache.
+@lru_cache(maxsize=TRACK_PAGE_CACHE_SIZE)
+def _render_track_page(announcement_id: Optional[int], title: str, details: str, target: str, default_user: str) -> str:
+    # Every value is escaped up front, then one format_map pass fills the page.
+    target_url = html.escape(target)
+    return TRACK_HTML.format_map({
+        "announcement_id": announcement_id,
+        "title": html.escape(title),
+        "details": html.escape(details),
+        "target_url": target_url,
+        "target_block": _TRACK_TARGET_HTML.format(target_url=target_url) if target_url else _TRACK_NO_TARGET_HTML,
+        "default_user": html.escape(default_user),
+    })
 
 
 @app.get("/proceed")
@@ -551,76 +1534,313 @@ def proceed():
     return redirect(target_url)
 
 
+ACK_HTML = """
+<!doctype html>
+<html>
+  <head>
+    <meta charset="utf-8" />
+    <meta name="viewport" content="width=device-width, initial-scale=1" />
+    <title>Thanks</title>
+    <style>
+      body { font-family: system-ui, -apple-system, Segoe UI, Roboto, sans-serif; margin: 2rem; }
+      .card { border: 1px solid #ddd; border-radius: 8px; padding: 1rem 1.25rem; max-width: 700px; }
+    </style>
+  </head>
+  <body>
+    <div class="card">
+      <h2>Thank you</h2>
+      <p>Your acknowledgment is recorded.</p>
+      <p><a href="/dashboard">Go to Dashboard</a></p>
+    </div>
+  </body>
+</html>
+"""
+
+# Constant page: encode and compress once at import, not per acknowledgment.
+_ACK_BYTES = ACK_HTML.encode("utf-8")
+_ACK_GZIP = gzip.compress(_ACK_BYTES, compresslevel=6, mtime=0)
+
+
+ACK_MAX_FORM_FIELDS = 16
+
+
 @app.post("/acknowledge")
 def acknowledge():
-    form = request.form
-    try:
-        announcement_id = int(form.get("announcementId")) if form.get("announcementId") else None
-    except ValueError:
+    if request.mimetype == "application/x-www-form-urlencoded":
+        # The acknowledge form has three known fields; parse them directly
+        # instead of building Werkzeug's form MultiDict.
+        try:
+            fields = parse_qs(request.get_data(cache=False, as_text=True), max_num_fields=ACK_MAX_FORM_FIELDS)
+        except ValueError:
+            return ("Too many form fields", 400)
+        form = {name: values[0] for name, values in fields.items()}
+    else:
+        form = request.form
+    raw_id = form.get("announcementId") or ""
+    if _is_plain_int(raw_id):
+        announcement_id: Optional[int] = int(raw_id)
+    elif raw_id:
         return ("Invalid announcementId", 400)
+    else:
+        announcement_id = None
     user = form.get("user") or "anonymous"
     target = form.get("target") or ""
 
-    device = request.headers.get("User-Agent", "")
+    ip, device = request_origin()
+    timestamp, epoch = utc_now_with_epoch()
     event = {
         "event": "acknowledged",
         "announcementId": announcement_id,
         "user": user,
         "target": target,
-        "timestamp": iso_utc_now(),
+        "timestamp": timestamp,
+        "ts": epoch,
         "device": device,
-        "ip": client_ip(),
+        "ip": ip,
     }
     append_event(event)
-    ann = None
-    if announcement_id is not None:
-        for a in announcements:
-            if a["id"] == announcement_id:
-                ann = a
-                break
-    send_sms_alert(event, ann)
-
-    html = """
-    <!doctype html>
-    <html>
-      <head>
-        <meta charset="utf-8" />
-        <meta name="viewport" content="width=device-width, initial-scale=1" />
-        <title>Thanks</title>
-        <style>
-          body { font-family: system-ui, -apple-system, Segoe UI, Roboto, sans-serif; margin: 2rem; }
-          .card { border: 1px solid #ddd; border-radius: 8px; padding: 1rem 1.25rem; max-width: 700px; }
-        </style>
-      </head>
-      <body>
-        <div class="card">
-          <h2>Thank you</h2>
-          <p>Your acknowledgment is recorded.</p>
-          <p><a href="/dashboard">Go to Dashboard</a></p>
+    ann = get_announcement(announcement_id)
+    queue_sms_alert(event, ann)
+
+    return html_response(_ACK_BYTES, _ACK_GZIP)
+
+
+DASHBOARD_HTML = """
+<!doctype html>
+<html>
+  <head>
+    <meta charset="utf-8" />
+    <meta name="viewport" content="width=device-width, initial-scale=1" />
+    <title>Dashboard</title>
+    <style>
+      body { font-family: system-ui, -apple-system, Segoe UI, Roboto, sans-serif; margin: 2rem; }
+      table { border-collapse: collapse; width: 100%; margin-bottom: 2rem; }
+      th, td { border: 1px solid #ddd; padding: 8px; }
+      th { background: #f6f6f6; text-align: left; }
+      h2 { margin-top: 2rem; }
+      code { font-size: 0.9em; }
+      .card { border: 1px solid #ddd; border-radius: 8px; padding: 1rem 1.25rem; margin-bottom: 1.5rem; }
+      input[type=text], input[type=url], textarea { width: 100%; padding: 0.5rem; border: 1px solid #ccc; border-radius: 6px; }
+      label { font-weight: 600; margin-top: 0.5rem; display: block; }
+      button { padding: 0.5rem 1rem; border: 0; border-radius: 6px; background: #2e6bff; color: white; cursor: pointer; }
+      .row { display: grid; gap: 0.5rem; max-width: 840px; }
+      .muted { color: #666; }
+      .flex { display: flex; align-items: center; gap: 0.5rem; }
+    </style>
+  </head>
+  <body>
+    <h1>Events Dashboard</h1>
+
+    <div class="card">
+      <h2>SMS Alerts</h2>
+      <form method="post" class="row">
+        <input type="hidden" name="form" value="sms" />
+        <label for="sms_numbers">Phone numbers (one per line or comma separated)</label>
+        <textarea id="sms_numbers" name="sms_numbers" rows="3" placeholder="+15551234567">{{ sms_text_value }}</textarea>
+        <button type="submit">Save Numbers</button>
+        <span class="muted">{{ sms_status }}</span>
+      </form>
+      <p class="muted">Configure Twilio via environment variables: TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, and TWILIO_FROM_NUMBER or TWILIO_MESSAGING_SERVICE_SID.</p>
+      {% if sms_env_numbers %}
+      <p class="muted">Additional numbers from SMS_RECIPIENTS env: {{ sms_env_numbers|join(', ') }}</p>
+      {% endif %}
+    </div>
+
+    <div class="card">
+      <h2>AI Insights</h2>
+      {% if ai_insights.overall.total_events %}
+      <p class="muted">Engine: {{ ai_insights.engine }} · Users: {{ ai_insights.overall.total_users }} · Conversion: {{ ai_insights.overall.conversion_rate }}%
+        {% if ai_insights.overall.avg_ack_minutes is not none %}· Avg ack delay: {{ ai_insights.overall.avg_ack_minutes }} min{% endif %}
+      </p>
+      {% if ai_insights.leaders %}
+      <h3>Top Contributors</h3>
+      <ul>
+        {% for item in ai_insights.leaders %}
+        <li><strong>{{ item.user }}</strong> — {{ item.classification }} · Score {{ '%.2f'|format(item.score) }} · Ack rate {{ item.ack_rate }}%
+          {% if item.avg_delay_minutes is not none %} · Avg delay {{ item.avg_delay_minutes }} min{% endif %}
+        </li>
+        {% endfor %}
+      </ul>
+      {% endif %}
+      {% if ai_insights.risks %}
+      <h3>At-Risk Users</h3>
+      <ul>
+        {% for item in ai_insights.risks %}
+        <li><strong>{{ item.user }}</strong> — {{ item.classification }} · Ack rate {{ item.ack_rate }}% · Outstanding {{ item.outstanding }} · Risk score {{ '%.2f'|format(item.risk_score) }}
+          {% if item.avg_delay_minutes is not none %} · Avg delay {{ item.avg_delay_minutes }} min{% endif %}
+        </li>
+        {% endfor %}
+      </ul>
+      {% endif %}
+      {% if ai_insights.insights %}
+      <h3>Highlights</h3>
+      <ul>
+        {% for message in ai_insights.insights %}
+        <li>{{ message }}</li>
+        {% endfor %}
+      </ul>
+      {% endif %}
+      {% else %}
+      <p class="muted">Not enough engagement data yet. Insights appear after users interact with announcements.</p>
+      {% endif %}
+    </div>
+
+    <div class="card">
+      <h2>Create Announcement</h2>
+      <form id="ann-form" class="row">
+        <div>
+          <label for="title">Title</label>
+          <input id="title" name="title" type="text" placeholder="Security Policy Update" required />
         </div>
-      </body>
-    </html>
-    """
+        <div>
+          <label for="details">Details</label>
+          <textarea id="details" name="details" rows="3" placeholder="Please review and acknowledge." required></textarea>
+        </div>
+        <div>
+          <label for="target">Target URL</label>
+          <input id="target" name="target" type="url" placeholder="https://example.com/security-policy" required />
+        </div>
+        <div>
+          <label for="user">Optional default user (query param)</label>
+          <input id="user" name="user" type="text" placeholder="employee@example.com" />
+        </div>
+        <div class="flex">
+          <button type="submit">Create</button>
+          <span id="status" class="muted"></span>
+        </div>
+      </form>
+      <div id="result" style="margin-top:0.75rem"></div>
+    </div>
+
+    <h2>Opened</h2>
+    <table>
+      <thead>
+        <tr>
+          <th>User</th>
+          <th>AnnouncementId</th>
+          <th>Time</th>
+          <th>Device</th>
+          <th>IP</th>
+          <th>Target</th>
+        </tr>
+      </thead>
+      <tbody id="opened-rows">
+        {{ opened }}
+      </tbody>
+    </table>
+
+    <h2>Acknowledged</h2>
+    <table>
+      <thead>
+        <tr>
+          <th>User</th>
+          <th>AnnouncementId</th>
+          <th>Time</th>
+          <th>Device</th>
+          <th>IP</th>
+          <th>Target</th>
+        </tr>
+      </thead>
+      <tbody id="ack-rows">
+        {{ acknowledged }}
+      </tbody>
+    </table>
+
+    <p class="muted">
+      Showing up to {{ page.limit }} of the latest events per table ({{ page.opened_total }} opened, {{ page.ack_total }} acknowledged).
+      {% if page.newer_offset is not none %}<a href="?limit={{ page.limit }}&amp;offset={{ page.newer_offset }}">Newer</a>{% endif %}
+      {% if page.older_offset is not none %}<a href="?limit={{ page.limit }}&amp;offset={{ page.older_offset }}">Load more</a>{% endif %}
+    </p>
+
+    <script>
+      const form = document.getElementById('ann-form');
+      const statusEl = document.getElementById('status');
+      const resultEl = document.getElementById('result');
+
+      form.addEventListener('submit', async (e) => {
+        e.preventDefault();
+        statusEl.textContent = 'Creating...';
+        resultEl.innerHTML = '';
+        const title = document.getElementById('title').value.trim();
+        const details = document.getElementById('details').value.trim();
+        const target = document.getElementById('target').value.trim();
+        const user = document.getElementById('user').value.trim();
+        try {
+          const r = await fetch('/announcement', {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify({ title, details, target })
+          });
+          const data = await r.json();
+          if (!r.ok) throw new Error(data.error || 'Failed');
+          let link = data.track;
+          if (user) {
+            const delim = link.includes('?') ? '&' : '?';
+            link = `${link}${delim}user=${encodeURIComponent(user)}`;
+          }
+          statusEl.textContent = 'Created.';
+          resultEl.innerHTML = `
+            <div class="flex">
+              <strong>Share link:</strong>
+              <a href="${link}" target="_blank" rel="noopener">${link}</a>
+              <button type="button" id="copy">Copy</button>
+            </div>`;
+          const copyBtn = document.getElementById('copy');
+          copyBtn?.addEventListener('click', async () => {
+            try { await navigator.clipboard.writeText(link); copyBtn.textContent = 'Copied'; setTimeout(()=>copyBtn.textContent='Copy', 1500);} catch {}
+          });
+        } catch (err) {
+          statusEl.textContent = err.message || 'Error';
+        }
+      });
+    </script>
+    {% if page.newer_offset is none %}
+    <script>
+      // Live view: append rows for events recorded after this page was rendered.
+      // A 204 (all stream slots busy) closes the source and the page stays static.
+      const live = new EventSource('/events/stream?opened={{ page.opened_total }}&ack={{ page.ack_total }}');
+      live.addEventListener('opened', (e) => document.getElementById('opened-rows').insertAdjacentHTML('beforeend', e.data));
+      live.addEventListener('acknowledged', (e) => document.getElementById('ack-rows').insertAdjacentHTML('beforeend', e.data));
+    </script>
+    {% endif %}
+  </body>
+</html>
+"""
+_DASHBOARD_TMPL = app.jinja_env.from_string(DASHBOARD_HTML)
+# Template output pieces per streamed chunk.
+DASHBOARD_STREAM_BUFFER = 50
+# Rows per event table; older rows are reached with ?offset=.
+DASHBOARD_PAGE_SIZE = 100
+DASHBOARD_MAX_PAGE_SIZE = 1000
+
+
+def _dashboard_etag(events_key: Any, analytics_key: Any) -> str:
+    # Everything the GET page is rendered from: log state, analytics snapshot,
+    # SMS recipients, announcement count and the pagination query.
+    parts = (
+        events_key,
+        analytics_key,
+        _recipients_cache["key"],
+        len(announcements_by_id),
+        request.query_string,
+    )
+    return hashlib.blake2b(repr(parts).encode("utf-8"), digest_size=12).hexdigest()
+
 
-    return render_template_string(html)
+def _newest_page(rows: List[Markup], total: int, limit: int, offset: int) -> Iterable[Markup]:
+    # `offset` counts back from the newest row; the page keeps chronological order.
+    stop = max(total - offset, 0)
+    return itertools.islice(rows, max(stop - limit, 0), stop)
 
 
 @app.route("/dashboard", methods=["GET", "POST"])
 def dashboard():
-    opened: List[Dict[str, Any]] = []
-    acknowledged: List[Dict[str, Any]] = []
     sms_status = ""
-    file_sms_numbers = load_sms_recipients_from_file()
-    sms_text_value = "\n".join(file_sms_numbers)
-    sms_env_numbers = get_env_sms_recipients()
-    events: List[Dict[str, Any]] = []
 
     if request.method == "POST":
         form_name = request.form.get("form")
         if form_name == "sms":
             numbers = save_sms_recipients(request.form.get("sms_numbers", ""))
-            file_sms_numbers = numbers
-            sms_text_value = "\n".join(file_sms_numbers)
             if numbers:
                 sms_status = f"Saved {len(numbers)} phone number(s)."
             else:
@@ -628,265 +1848,163 @@ def dashboard():
         else:
             sms_status = "Unrecognised form submission."
 
-    if os.path.exists(EVENTS_FILE):
-        with open(EVENTS_FILE, "r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    rec = json.loads(line)
-                except json.JSONDecodeError:
-                    continue
-                events.append(rec)
-                if rec.get("event") == "opened":
-                    opened.append(rec)
-                elif rec.get("event") == "acknowledged":
-                    acknowledged.append(rec)
-
-    ai_insights = generate_user_analytics(events)
-
-    # Simple table renderer
-    html = """
-    <!doctype html>
-    <html>
-      <head>
-        <meta charset="utf-8" />
-        <meta name="viewport" content="width=device-width, initial-scale=1" />
-        <title>Dashboard</title>
-        <style>
-          body { font-family: system-ui, -apple-system, Segoe UI, Roboto, sans-serif; margin: 2rem; }
-          table { border-collapse: collapse; width: 100%; margin-bottom: 2rem; }
-          th, td { border: 1px solid #ddd; padding: 8px; }
-          th { background: #f6f6f6; text-align: left; }
-          h2 { margin-top: 2rem; }
-          code { font-size: 0.9em; }
-          .card { border: 1px solid #ddd; border-radius: 8px; padding: 1rem 1.25rem; margin-bottom: 1.5rem; }
-          input[type=text], input[type=url], textarea { width: 100%; padding: 0.5rem; border: 1px solid #ccc; border-radius: 6px; }
-          label { font-weight: 600; margin-top: 0.5rem; display: block; }
-          button { padding: 0.5rem 1rem; border: 0; border-radius: 6px; background: #2e6bff; color: white; cursor: pointer; }
-          .row { display: grid; gap: 0.5rem; max-width: 840px; }
-          .muted { color: #666; }
-          .flex { display: flex; align-items: center; gap: 0.5rem; }
-        </style>
-      </head>
-      <body>
-        <h1>Events Dashboard</h1>
-
-        <div class="card">
-          <h2>SMS Alerts</h2>
-          <form method="post" class="row">
-            <input type="hidden" name="form" value="sms" />
-            <label for="sms_numbers">Phone numbers (one per line or comma separated)</label>
-            <textarea id="sms_numbers" name="sms_numbers" rows="3" placeholder="+15551234567">{{ sms_text_value }}</textarea>
-            <button type="submit">Save Numbers</button>
-            <span class="muted">{{ sms_status }}</span>
-          </form>
-          <p class="muted">Configure Twilio via environment variables: TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, TWILIO_FROM_NUMBER.</p>
-          {% if sms_env_numbers %}
-          <p class="muted">Additional numbers from SMS_RECIPIENTS env: {{ sms_env_numbers|join(', ') }}</p>
-          {% endif %}
-        </div>
-
-        <div class="card">
-          <h2>AI Insights</h2>
-          {% if ai_insights.overall.total_events %}
-          <p class="muted">Engine: {{ ai_insights.engine }} · Users: {{ ai_insights.overall.total_users }} · Conversion: {{ ai_insights.overall.conversion_rate }}%
-            {% if ai_insights.overall.avg_ack_minutes is not none %}· Avg ack delay: {{ ai_insights.overall.avg_ack_minutes }} min{% endif %}
-          </p>
-          {% if ai_insights.leaders %}
-          <h3>Top Contributors</h3>
-          <ul>
-            {% for item in ai_insights.leaders %}
-            <li><strong>{{ item.user }}</strong> — {{ item.classification }} · Score {{ '%.2f'|format(item.score) }} · Ack rate {{ item.ack_rate }}%
-              {% if item.avg_delay_minutes is not none %} · Avg delay {{ item.avg_delay_minutes }} min{% endif %}
-            </li>
-            {% endfor %}
-          </ul>
-          {% endif %}
-          {% if ai_insights.risks %}
-          <h3>At-Risk Users</h3>
-          <ul>
-            {% for item in ai_insights.risks %}
-            <li><strong>{{ item.user }}</strong> — {{ item.classification }} · Ack rate {{ item.ack_rate }}% · Outstanding {{ item.outstanding }} · Risk score {{ '%.2f'|format(item.risk_score) }}
-              {% if item.avg_delay_minutes is not none %} · Avg delay {{ item.avg_delay_minutes }} min{% endif %}
-            </li>
-            {% endfor %}
-          </ul>
-          {% endif %}
-          {% if ai_insights.insights %}
-          <h3>Highlights</h3>
-          <ul>
-            {% for message in ai_insights.insights %}
-            <li>{{ message }}</li>
-            {% endfor %}
-          </ul>
-          {% endif %}
-          {% else %}
-          <p class="muted">Not enough engagement data yet. Insights appear after users interact with announcements.</p>
-          {% endif %}
-        </div>
-
-        <div class="card">
-          <h2>Create Announcement</h2>
-          <form id="ann-form" class="row">
-            <div>
-              <label for="title">Title</label>
-              <input id="title" name="title" type="text" placeholder="Security Policy Update" required />
-            </div>
-            <div>
-              <label for="details">Details</label>
-              <textarea id="details" name="details" rows="3" placeholder="Please review and acknowledge." required></textarea>
-            </div>
-            <div>
-              <label for="target">Target URL</label>
-              <input id="target" name="target" type="url" placeholder="https://example.com/security-policy" required />
-            </div>
-            <div>
-              <label for="user">Optional default user (query param)</label>
-              <input id="user" name="user" type="text" placeholder="employee@example.com" />
-            </div>
-            <div class="flex">
-              <button type="submit">Create</button>
-              <span id="status" class="muted"></span>
-            </div>
-          </form>
-          <div id="result" style="margin-top:0.75rem"></div>
-        </div>
-
-        <h2>Opened</h2>
-        <table>
-          <thead>
-            <tr>
-              <th>User</th>
-              <th>AnnouncementId</th>
-              <th>Time</th>
-              <th>Device</th>
-              <th>IP</th>
-              <th>Target</th>
-            </tr>
-          </thead>
-          <tbody>
-            {% for e in opened %}
-            <tr>
-              <td>{{ e.get('user','') }}</td>
-              <td>{{ e.get('announcementId','') }}</td>
-              <td><code>{{ e.get('timestamp','') }}</code></td>
-              <td><code title="{{ e.get('device','') }}">{{ e.get('device','')[:60] }}</code></td>
-              <td>{{ e.get('ip','') }}</td>
-              <td>{% if e.get('target') %}<a href="{{ e.get('target') }}" target="_blank" rel="noopener">link</a>{% endif %}</td>
-            </tr>
-            {% endfor %}
-          </tbody>
-        </table>
-
-        <h2>Acknowledged</h2>
-        <table>
-          <thead>
-            <tr>
-              <th>User</th>
-              <th>AnnouncementId</th>
-              <th>Time</th>
-              <th>Device</th>
-              <th>IP</th>
-              <th>Target</th>
-            </tr>
-          </thead>
-          <tbody>
-            {% for e in acknowledged %}
-            <tr>
-              <td>{{ e.get('user','') }}</td>
-              <td>{{ e.get('announcementId','') }}</td>
-              <td><code>{{ e.get('timestamp','') }}</code></td>
-              <td><code title="{{ e.get('device','') }}">{{ e.get('device','')[:60] }}</code></td>
-              <td>{{ e.get('ip','') }}</td>
-              <td>{% if e.get('target') %}<a href="{{ e.get('target') }}" target="_blank" rel="noopener">link</a>{% endif %}</td>
-            </tr>
-            {% endfor %}
-          </tbody>
-        </table>
-
-        <script>
-          const form = document.getElementById('ann-form');
-          const statusEl = document.getElementById('status');
-          const resultEl = document.getElementById('result');
-
-          form.addEventListener('submit', async (e) => {
-            e.preventDefault();
-            statusEl.textContent = 'Creating...';
-            resultEl.innerHTML = '';
-            const title = document.getElementById('title').value.trim();
-            const details = document.getElementById('details').value.trim();
-            const target = document.getElementById('target').value.trim();
-            const user = document.getElementById('user').value.trim();
-            try {
-              const r = await fetch('/announcement', {
-                method: 'POST',
-                headers: {'Content-Type': 'application/json'},
-                body: JSON.stringify({ title, details, target })
-              });
-              const data = await r.json();
-              if (!r.ok) throw new Error(data.error || 'Failed');
-              let link = data.track;
-              if (user) {
-                const delim = link.includes('?') ? '&' : '?';
-                link = `${link}${delim}user=${encodeURIComponent(user)}`;
-              }
-              statusEl.textContent = 'Created.';
-              resultEl.innerHTML = `
-                <div class="flex">
-                  <strong>Share link:</strong>
-                  <a href="${link}" target="_blank" rel="noopener">${link}</a>
-                  <button type="button" id="copy">Copy</button>
-                </div>`;
-              const copyBtn = document.getElementById('copy');
-              copyBtn?.addEventListener('click', async () => {
-                try { await navigator.clipboard.writeText(link); copyBtn.textContent = 'Copied'; setTimeout(()=>copyBtn.textContent='Copy', 1500);} catch {}
-              });
-            } catch (err) {
-              statusEl.textContent = err.message || 'Error';
-            }
-          });
-        </script>
-      </body>
-    </html>
-    """
+    sms_text_value, sms_env_numbers = sms_recipients_snapshot()
+
+    events_key, opened, acknowledged = load_events()
+    # Read before the value: if the refresher swaps in newer analytics meanwhile,
+    # the page is newer than its tag, never older, so a 304 cannot go stale.
+    analytics_key = _analytics_cache["key"]
+    ai_insights = latest_user_analytics(events_key)
+
+    etag = None
+    # Only GETs are cacheable; a POST renders a one-off status line.
+    if request.method == "GET":
+        etag = _dashboard_etag(events_key, analytics_key)
+        if request.if_none_match.contains_weak(etag):
+            response = Response(status=304)
+            response.set_etag(etag, weak=True)
+            response.headers["Cache-Control"] = "no-cache"
+            return response
+
+    limit = min(max(request.args.get("limit", DASHBOARD_PAGE_SIZE, type=int), 1), DASHBOARD_MAX_PAGE_SIZE)
+    offset = max(request.args.get("offset", 0, type=int), 0)
+    opened_total, ack_total = len(opened), len(acknowledged)
+    page = {
+        "limit": limit,
+        "opened_total": opened_total,
+        "ack_total": ack_total,
+        "newer_offset": max(offset - limit, 0) if offset else None,
+        "older_offset": offset + limit if offset + limit < max(opened_total, ack_total) else None,
+    }
 
-    return render_template_string(
-        html,
-        opened=opened,
-        acknowledged=acknowledged,
+    # Stream the page in chunks instead of building the whole HTML string; the
+    # cached lists only ever grow, so islice pins the rows present right now.
+    stream = _DASHBOARD_TMPL.stream(
+        # Rows are prebuilt Markup, so each table is a single join rather than a Jinja loop.
+        opened=Markup("".join(_newest_page(opened, opened_total, limit, offset))),
+        acknowledged=Markup("".join(_newest_page(acknowledged, ack_total, limit, offset))),
+        page=page,
         sms_status=sms_status,
         sms_text_value=sms_text_value,
         sms_env_numbers=sms_env_numbers,
         ai_insights=ai_insights,
     )
-
-
-@app.get("/")
-def home():
-    base = request.host_url.rstrip("/")
-    example = {
-        "title": "Security Policy Update",
-        "details": "Please review and proceed to acknowledge.",
-        "target": "https://example.com/security-policy",
-    }
-    return render_template_string(
-        """
+    stream.enable_buffering(DASHBOARD_STREAM_BUFFER)
+    response = Response(stream_with_context(stream), mimetype="text/html")
+    if etag is not None:
+        response.set_etag(etag, weak=True)
+        response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+# Server-sent events: the dashboard's live rows. Each connection is polled in its
+# own request thread, so it is closed after EVENTS_STREAM_MAX_SECONDS and the
+# browser reconnects, resuming from the Last-Event-ID cursor.
+EVENTS_STREAM_POLL_SECONDS = 1.0
+EVENTS_STREAM_KEEPALIVE_SECONDS = 15.0
+EVENTS_STREAM_MAX_SECONDS = 300.0
+EVENTS_STREAM_RETRY_MS = 2000
+# Each open stream holds a request thread (a greenlet under GEVENT_WORKER), so only
+# a few may run at once; the rest get 204, which tells EventSource to stop and
+# leaves the dashboard as rendered.
+EVENTS_STREAM_MAX_CLIENTS = int(os.environ.get("EVENTS_STREAM_MAX_CLIENTS") or (200 if os.environ.get("GEVENT_WORKER") else 2))
+_events_stream_slots = threading.BoundedSemaphore(EVENTS_STREAM_MAX_CLIENTS)
+
+
+def _stream_cursor() -> List[int]:
+    # "<opened rows>-<acknowledged rows>" already delivered; the page passes its own
+    # counts on first connect and EventSource echoes the last id on reconnect.
+    last_id = request.headers.get("Last-Event-ID", "")
+    opened, sep, ack = last_id.partition("-")
+    if not (sep and _is_plain_int(opened) and _is_plain_int(ack)):
+        opened, ack = request.args.get("opened", ""), request.args.get("ack", "")
+    if _is_plain_int(opened) and _is_plain_int(ack):
+        return [int(opened), int(ack)]
+    _, opened_rows, ack_rows = load_events()
+    return [len(opened_rows), len(ack_rows)]
+
+
+@app.get("/events/stream")
+def events_stream():
+    if not _events_stream_slots.acquire(blocking=False):
+        return Response(status=204, headers={"Cache-Control": "no-store"})
+    try:
+        cursor = _stream_cursor()
+    except BaseException:
+        _events_stream_slots.release()
+        raise
+
+    def generate() -> Iterable[str]:
+        deadline = time.monotonic() + EVENTS_STREAM_MAX_SECONDS
+        last_sent = time.monotonic()
+        yield f"retry: {EVENTS_STREAM_RETRY_MS}\n\n"
+        while True:
+            # No writer barrier per poll: lines still queued show up on the next one.
+            _, opened, acknowledged = load_events(flush=False)
+            chunks: List[str] = []
+            for idx, (name, rows) in enumerate((("opened", opened), ("acknowledged", acknowledged))):
+                total = len(rows)
+                if total < cursor[idx]:  # log rotated; its table restarted
+                    cursor[idx] = 0
+                for row in itertools.islice(rows, cursor[idx], total):
+                    cursor[idx] += 1
+                    data = "".join(f"data: {part}\n" for part in row.split("\n"))
+                    chunks.append(f"event: {name}\nid: {cursor[0]}-{cursor[1]}\n{data}\n")
+            now = time.monotonic()
+            if chunks:
+                last_sent = now
+                yield "".join(chunks)
+            elif now - last_sent >= EVENTS_STREAM_KEEPALIVE_SECONDS:
+                last_sent = now
+                yield ": keepalive\n\n"
+            if now >= deadline:
+                return
+            time.sleep(EVENTS_STREAM_POLL_SECONDS)
+
+    response = Response(generate(), mimetype="text/event-stream")
+    # Runs when the server closes the response, even if the body was never iterated.
+    response.call_on_close(_events_stream_slots.release)
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+
+HOME_HTML = """
         <html><head><meta charset="utf-8" /><title>Ack Tracker</title>
         <style>body{font-family:system-ui,-apple-system,Segoe UI,Roboto,sans-serif;margin:2rem}code{background:#f6f6f6;padding:2px 4px;border-radius:4px}</style>
         </head><body>
         <h2>Acknowledgment Tracker</h2>
         <p>Create an announcement via:</p>
-        <pre>curl -X POST '{{base}}/announcement' \
+        <pre>curl -X POST '{base}/announcement' \
   -H 'Content-Type: application/json' \
-  -d '{"title":"{title}","details":"{details}","target":"{target}"}'</pre>
+  -d '{"title":"Security Policy Update","details":"Please review and proceed to acknowledge.","target":"https://example.com/security-policy"}'</pre>
         <p>Open the dashboard: <a href="/dashboard">/dashboard</a></p>
         </body></html>
-        """.replace("{base}", base).replace("{title}", example["title"]).replace("{details}", example["details"]).replace("{target}", example["target"])  # noqa: E501
-    )
+        """
+# The page only varies with the request host, so keep the finished HTML per host.
+# Host is client-controlled, hence the small bound.
+HOME_CACHE_MAX_HOSTS = 64
+_home_pages: Dict[str, bytes] = {}
+
+
+def _build_home(host_url: str) -> bytes:
+    return HOME_HTML.replace("{base}", html.escape(host_url.rstrip("/"))).encode("utf-8")
+
+
+@app.get("/")
+def home():
+    host_url = request.host_url
+    body = _home_pages.get(host_url)
+    if body is None:
+        if len(_home_pages) >= HOME_CACHE_MAX_HOSTS:
+            _home_pages.clear()
+        body = _home_pages[host_url] = _build_home(host_url)
+    response = Response(body, mimetype="text/html")
+    response.headers["Cache-Control"] = "public, max-age=300"
+    return response
 
 
 if __name__ == "__main__":
-    # Built-in dev server at http://localhost:5000
-    app.run(host="127.0.0.1", port=5000, debug=True)
+    # Built-in dev server at http://localhost:5000; use gunicorn.conf.py in production.
+    # FLASK_DEV=1 turns on the debugger and reloader.
+    app.run(host="127.0.0.1", port=5000, debug=bool(os.environ.get("FLASK_DEV")))
@@ -0,0 +1,22 @@
+# Production server settings: gunicorn -c gunicorn.conf.py app:app
+import os
+
+bind = os.environ.get("BIND", "127.0.0.1:5000")
+
+# Without ANNOUNCEMENTS_DB, announcements live in process memory and ids come
+# from a per-process counter, so keep a single worker unless that is set;
+# request concurrency comes from threads (or greenlets) instead.
+workers = int(os.environ.get("WEB_CONCURRENCY", "1"))
+if os.environ.get("GEVENT_WORKER"):
+    # Cooperative greenlets: one worker holds many slow clients; app.py patches
+    # the stdlib at import when GEVENT_WORKER is set. Needs gevent from
+    # requirements-optional.txt.
+    worker_class = "gevent"
+    worker_connections = int(os.environ.get("GEVENT_WORKER_CONNECTIONS", "1000"))
+else:
+    worker_class = "gthread"
+    threads = int(os.environ.get("GUNICORN_THREADS", "8"))
+
+# Import the app (templates, numba kernel warm-up) once in the master and
+# share it copy-on-write; background threads start lazily in each worker.
+preload_app = True
@@ -1,3 +1,5 @@
+from concurrent.futures import ThreadPoolExecutor
+import gzip
 from pathlib import Path
 import sys
 from urllib.parse import parse_qs, urlparse
@@ -11,6 +13,14 @@ if str(ROOT) not in sys.path:
 import app as app_module
 
 
+@pytest.fixture(autouse=True)
+def close_events_log(monkeypatch):
+    # Depends on monkeypatch so it runs before EVENTS_FILE is restored: the
+    # writer thread outlives the test and must not be left holding its log.
+    yield
+    app_module.close_events_log()
+
+
 @pytest.fixture
 def client(monkeypatch, tmp_path):
     events: list[dict] = []
@@ -21,15 +31,13 @@ def client(monkeypatch, tmp_path):
     monkeypatch.setattr(app_module, "append_event", capture_event)
     monkeypatch.setattr(app_module, "EVENTS_FILE", str(tmp_path / "events.json"))
 
-    app_module.announcements.clear()
-    app_module.next_announcement_id = 1
+    app_module.reset_announcements()
     app_module.app.config.update(TESTING=True)
 
     with app_module.app.test_client() as test_client:
         yield test_client, events
 
-    app_module.announcements.clear()
-    app_module.next_announcement_id = 1
+    app_module.reset_announcements()
 
 
 def _create_sample_announcement(client):
@@ -43,6 +51,14 @@ def _create_sample_announcement(client):
     return payload, response.get_json()
 
 
+def test_tracking_link_encodes_target_query(client):
+    test_client, _ = client
+    target = "https://example.com/form?step=2&lang=en#top"
+    response = test_client.post("/announcement", json={"title": "T", "details": "D", "target": target})
+    params = parse_qs(urlparse(response.get_json()["track"]).query)
+    assert params == {"id": ["1"], "target": [target]}
+
+
 def test_create_announcement_returns_tracking_link(client):
     test_client, events = client
     payload, data = _create_sample_announcement(test_client)
@@ -61,6 +77,26 @@ def test_create_announcement_returns_tracking_link(client):
     assert events == []  # No tracking event until the link is opened.
 
 
+def test_create_announcement_rejects_invalid_payloads(client):
+    test_client, _ = client
+    for payload in ({"title": "T", "details": "D"}, {"title": 5, "details": "D", "target": "https://e.com"}, {"title": "", "details": "D", "target": "https://e.com"}):
+        response = test_client.post("/announcement", json=payload)
+        assert response.status_code == 400
+        assert "Missing required fields" in response.get_json()["error"]
+    assert test_client.post("/announcement", data="{not json", content_type="application/json").status_code == 400
+    response = test_client.post("/announcement", json={"title": "T", "details": "D", "target": "javascript:alert(1)"})
+    assert response.status_code == 400
+    assert app_module.announcements == []
+
+
+def test_create_announcement_type_checks_without_msgspec(client, monkeypatch):
+    test_client, _ = client
+    monkeypatch.setattr(app_module, "msgspec", None)
+    for payload in ({"title": 5, "details": "D", "target": "https://e.com"}, ["T", "D", "https://e.com"]):
+        assert test_client.post("/announcement", json=payload).status_code == 400
+    assert test_client.post("/announcement", json={"title": "T", "details": "D", "target": "https://e.com"}).status_code == 201
+
+
 def test_track_open_records_event_and_contains_task_link(client):
     test_client, events = client
     payload, _ = _create_sample_announcement(test_client)
@@ -72,6 +108,7 @@ def test_track_open_records_event_and_contains_task_link(client):
             "target": payload["target"],
             "user": "employee@example.com",
         },
+        headers={"X-Forwarded-For": "203.0.113.7, 10.0.0.2"},
     )
 
     assert response.status_code == 200
@@ -86,6 +123,60 @@ def test_track_open_records_event_and_contains_task_link(client):
     assert opened["announcementId"] == 1
     assert opened["target"] == payload["target"]
     assert opened["user"] == "employee@example.com"
+    assert isinstance(opened["ts"], float)
+    assert opened["ip"] == "203.0.113.7"
+    assert abs(app_module.event_epoch({"timestamp": opened["timestamp"]}) - opened["ts"]) < 1e-5
+
+
+def test_client_ip_falls_back_to_remote_addr_for_blank_first_hop():
+    with app_module.app.test_request_context(
+        "/track", headers={"X-Forwarded-For": " , 10.0.0.2"}, environ_base={"REMOTE_ADDR": "198.51.100.4"}
+    ):
+        assert app_module.client_ip() == "198.51.100.4"
+
+
+def test_event_epoch_fast_path_matches_datetime_and_rejects_corrupt_digits():
+    assert app_module.event_epoch({"timestamp": "2025-01-01T10:00:00.250000Z"}) == 1735725600.25
+    assert app_module.event_epoch({"timestamp": "2025-01-01T10:00:00.²50000Z"}) is None
+    assert app_module.event_epoch({"timestamp": "2025-0²-01T10:00:00Z"}) is None
+
+
+def test_track_page_cache_follows_announcement_content(client):
+    test_client, _ = client
+    # Unknown id renders the generic page; once created, the same link shows the real one.
+    assert "Security Update" not in test_client.get("/track?id=1").data.decode("utf-8")
+    _create_sample_announcement(test_client)
+    assert "Security Update" in test_client.get("/track?id=1").data.decode("utf-8")
+
+
+def test_invalid_announcement_ids_are_rejected(client):
+    test_client, events = client
+    for raw in ("abc", "1.5", "²", "-1", "9" * 5000):
+        assert test_client.get("/track", query_string={"id": raw}).status_code == 400
+        assert test_client.post("/acknowledge", data={"announcementId": raw}).status_code == 400
+    assert events == []
+
+
+def test_track_page_served_precompressed_to_gzip_clients(client):
+    test_client, _ = client
+    _create_sample_announcement(test_client)
+    plain = test_client.get("/track?id=1").data
+    response = test_client.get("/track?id=1", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert gzip.decompress(response.data) == plain
+
+
+def test_acknowledge_serves_constant_page(client):
+    test_client, _ = client
+    _create_sample_announcement(test_client)
+    form = {"announcementId": "1", "user": "employee@example.com"}
+    plain = test_client.post("/acknowledge", data=form)
+    assert plain.data == app_module._ACK_BYTES
+    assert plain.headers["Content-Length"] == str(len(app_module._ACK_BYTES))
+    packed = test_client.post("/acknowledge", data=form, headers={"Accept-Encoding": "gzip"})
+    assert packed.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(packed.data) == app_module._ACK_BYTES
 
 
 def test_acknowledge_records_event(client):
@@ -117,6 +208,40 @@ def test_acknowledge_records_event(client):
     assert ack["user"] == "employee@example.com"
 
 
+def test_home_page_shows_curl_example_for_request_host(client):
+    test_client, _ = client
+    response = test_client.get("/", base_url="http://acks.example.com")
+    assert response.headers["Cache-Control"] == "public, max-age=300"
+    body = response.data.decode("utf-8")
+    assert "curl -X POST 'http://acks.example.com/announcement'" in body
+    assert test_client.get("/", base_url="http://acks.example.com").data.decode("utf-8") == body
+
+
+def test_store_announcement_issues_unique_ids_across_threads(client):
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        anns = list(pool.map(lambda idx: app_module.store_announcement(f"t{idx}", "d", "https://e.com"), range(400)))
+    assert sorted(ann["id"] for ann in anns) == list(range(1, 401))
+    assert len(app_module.announcements_by_id) == 400
+
+
+def test_announcements_db_shares_ids_and_lookups(client, monkeypatch, tmp_path):
+    test_client, _ = client
+    monkeypatch.setattr(app_module, "ANNOUNCEMENTS_DB", str(tmp_path / "ack.db"))
+    _, data = _create_sample_announcement(test_client)
+    assert data["announcement"]["id"] == 1
+
+    # Another worker process starts with empty in-memory state.
+    app_module.reset_announcements()
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        found = list(pool.map(app_module.get_announcement, [1] * 32))
+    assert all(ann["title"] == "Security Update" for ann in found)
+    assert len(app_module.announcements) == 1  # cached once despite concurrent misses
+    assert app_module.get_announcement(99) is None
+    _, data = _create_sample_announcement(test_client)
+    assert data["announcement"]["id"] == 2
+
+
 def test_proceed_redirects_to_track(client):
     test_client, events = client
     payload, _ = _create_sample_announcement(test_client)
@@ -134,3 +259,364 @@ def test_proceed_redirects_to_track(client):
     assert params["id"] == ["1"]
     assert params["target"] == [payload["target"]]
     assert len(events) == 0
+
+
+def _write_events(path, records):
+    with open(path, "a", encoding="utf-8") as f:
+        for record in records:
+            f.write(app_module.json.dumps(record) + "\n")
+
+
+def test_dashboard_picks_up_appended_events(client):
+    test_client, _ = client
+    events_file = app_module.EVENTS_FILE
+    _write_events(
+        events_file,
+        [
+            {"event": "opened", "announcementId": 1, "user": "alice@example.com", "timestamp": "2025-01-01T10:00:00.000000Z"},
+            {"event": "acknowledged", "announcementId": 1, "user": "alice@example.com", "timestamp": "2025-01-01T10:05:00.000000Z"},
+        ],
+    )
+
+    response = test_client.get("/dashboard")
+    assert response.is_streamed
+    body = response.data.decode("utf-8")
+    assert "alice@example.com" in body
+    assert "bob@example.com" not in body
+
+    _write_events(
+        events_file,
+        [{"event": "opened", "announcementId": 1, "user": "bob@example.com", "timestamp": "2025-01-01T11:00:00.000000Z"}],
+    )
+
+    body = test_client.get("/dashboard").data.decode("utf-8")
+    assert "alice@example.com" in body
+    assert "bob@example.com" in body
+
+
+def test_load_events_defers_partial_lines_and_resets_on_truncation(client):
+    events_file = app_module.EVENTS_FILE
+    opened = {"event": "opened", "announcementId": 1, "user": "alice@example.com", "timestamp": "2025-01-01T10:00:00.000000Z"}
+    _write_events(events_file, [opened])
+    partial = app_module.json.dumps({"event": "opened", "announcementId": 1, "user": "bob@example.com"})
+    with open(events_file, "a", encoding="utf-8") as f:
+        f.write(partial[:10])
+
+    _, first, _ = app_module.load_events()
+    assert len(first) == 1 and "alice@example.com" in first[0]
+
+    with open(events_file, "a", encoding="utf-8") as f:
+        f.write(partial[10:] + "\n")
+    _, second, _ = app_module.load_events()
+    assert len(second) == 2 and "bob@example.com" in second[1]
+
+    with open(events_file, "w", encoding="utf-8") as f:
+        f.write("")
+    _write_events(events_file, [dict(opened, user="carol@example.com")])
+    _, third, _ = app_module.load_events()
+    assert len(third) == 1 and "carol@example.com" in third[0]
+
+
+def test_load_events_skips_records_it_cannot_apply(client):
+    opened = {"event": "opened", "announcementId": 1, "user": "alice@example.com", "timestamp": "2025-01-01T10:00:00.000000Z"}
+    _write_events(app_module.EVENTS_FILE, [opened, dict(opened, device=None), 5, dict(opened, device=7), dict(opened, user="bob@example.com")])
+
+    for _ in range(2):
+        key, rows, _ = app_module.load_events()
+        assert len(rows) == 3 and "bob@example.com" in rows[-1]
+    analytics = app_module.cached_user_analytics(key)
+    assert analytics["overall"]["total_events"] == 3
+    assert app_module._events_cache["user_stats"]["alice@example.com"]["open_count"] == 2
+
+
+@pytest.mark.skipif(app_module.Compress is None, reason="flask-compress not installed")
+def test_dashboard_is_compressed_for_accepting_clients(client):
+    test_client, _ = client
+    response = test_client.get("/dashboard", headers={"Accept-Encoding": "gzip, deflate, br"})
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] in {"br", "deflate"}
+    assert response.headers["Vary"] == "Accept-Encoding"
+
+
+def test_dashboard_etag_returns_304_until_events_change(client):
+    test_client, _ = client
+    record = {"event": "opened", "announcementId": 1, "user": "alice@example.com", "timestamp": "2025-01-01T10:00:00.000000Z"}
+    _write_events(app_module.EVENTS_FILE, [record])
+
+    test_client.get("/dashboard").close()  # first render computes the analytics inline
+    first = test_client.get("/dashboard")
+    first.close()
+    etag = first.headers["ETag"]
+    assert etag.startswith('W/"')
+    assert test_client.get("/dashboard", headers={"If-None-Match": etag}).status_code == 304
+
+    _write_events(app_module.EVENTS_FILE, [dict(record, user="bob@example.com")])
+    response = test_client.get("/dashboard", headers={"If-None-Match": etag})
+    response.close()
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_dashboard_pages_through_newest_events(client):
+    test_client, _ = client
+    _write_events(
+        app_module.EVENTS_FILE,
+        [
+            {"event": "opened", "announcementId": 1, "user": f"user{idx}@example.com", "timestamp": "2025-01-01T10:00:00.000000Z"}
+            for idx in range(5)
+        ],
+    )
+
+    # Insights may mention any user, so only look at the event tables.
+    body = test_client.get("/dashboard?limit=2").data.decode("utf-8").split("<h2>Opened</h2>")[1]
+    assert "user4@example.com" in body and "user3@example.com" in body
+    assert "user2@example.com" not in body
+    assert "offset=2" in body
+
+    body = test_client.get("/dashboard?limit=2&offset=4").data.decode("utf-8").split("<h2>Opened</h2>")[1]
+    assert "user0@example.com" in body
+    assert "user1@example.com" not in body
+    assert "Load more" not in body
+
+
+def test_load_events_parses_in_line_aligned_windows(client, monkeypatch):
+    monkeypatch.setattr(app_module, "EVENTS_INGEST_CHUNK", 64)
+    records = [
+        {"event": "opened", "announcementId": idx, "user": f"user{idx}@example.com", "timestamp": "2025-01-01T10:00:00.000000Z"}
+        for idx in range(10)
+    ]
+    _write_events(app_module.EVENTS_FILE, records)
+
+    _, opened, _ = app_module.load_events()
+    assert len(opened) == 10
+    assert all(f"user{idx}@example.com" in row for idx, row in enumerate(opened))
+
+
+def test_events_stream_sends_rows_after_cursor(client, monkeypatch):
+    test_client, _ = client
+    monkeypatch.setattr(app_module, "EVENTS_STREAM_MAX_SECONDS", 0)
+    _write_events(
+        app_module.EVENTS_FILE,
+        [
+            {"event": "opened", "announcementId": 1, "user": "alice@example.com", "timestamp": "2025-01-01T10:00:00.000000Z"},
+            {"event": "opened", "announcementId": 1, "user": "bob@example.com", "timestamp": "2025-01-01T10:01:00.000000Z"},
+            {"event": "acknowledged", "announcementId": 1, "user": "alice@example.com", "timestamp": "2025-01-01T10:05:00.000000Z"},
+        ],
+    )
+
+    response = test_client.get("/events/stream?opened=1&ack=0")
+    assert response.mimetype == "text/event-stream"
+    body = response.data.decode("utf-8")
+    response.close()
+    assert "alice@example.com" in body and "bob@example.com" in body
+    assert body.count("event: opened") == 1
+    assert "id: 2-1" in body
+
+    response = test_client.get("/events/stream", headers={"Last-Event-ID": "2-1"})
+    body = response.data.decode("utf-8")
+    response.close()
+    assert "event:" not in body
+
+    # Malformed cursors fall back to "everything so far" instead of failing int().
+    for query, headers in (("opened=²&ack=0", {}), ("", {"Last-Event-ID": "²-0"}), (f"opened={'9' * 5000}&ack=0", {})):
+        response = test_client.get(f"/events/stream?{query}", headers=headers)
+        response.close()  # frees the stream slot
+        assert response.status_code == 200
+        assert "event:" not in response.data.decode("utf-8")
+
+
+def test_events_stream_limits_concurrent_clients(client, monkeypatch):
+    test_client, _ = client
+    monkeypatch.setattr(app_module, "EVENTS_STREAM_MAX_SECONDS", 0)
+    slots = app_module.threading.BoundedSemaphore(1)
+    monkeypatch.setattr(app_module, "_events_stream_slots", slots)
+
+    slots.acquire()  # another dashboard holds the only stream
+    assert test_client.get("/events/stream?opened=0&ack=0").status_code == 204
+    slots.release()
+
+    response = test_client.get("/events/stream?opened=0&ack=0")
+    assert response.status_code == 200
+    response.close()
+    assert slots.acquire(blocking=False)  # freed when the response closed
+
+
+def test_incremental_analytics_match_full_rebuild(client):
+    events_file = app_module.EVENTS_FILE
+    first_batch = [
+        {"event": "opened", "announcementId": 1, "user": "alice@example.com", "timestamp": "2025-01-01T10:00:00.000000Z"},
+        {"event": "opened", "announcementId": 1, "user": "bob@example.com", "timestamp": "2025-01-01T10:01:00.000000Z"},
+        {"event": "acknowledged", "announcementId": 1, "user": "alice@example.com", "timestamp": "2025-01-01T10:05:00.000000Z"},
+    ]
+    second_batch = [
+        {"event": "opened", "announcementId": 2, "user": "carol@example.com", "timestamp": "2025-01-01T12:00:00.000000Z"},
+        {"event": "acknowledged", "announcementId": 1, "user": "bob@example.com", "timestamp": "2025-01-01T14:01:00.000000Z"},
+        {"event": "opened", "announcementId": 2, "user": "alice@example.com", "timestamp": "2025-01-01T15:00:00.000000Z"},
+    ]
+
+    _write_events(events_file, first_batch)
+    key, _, _ = app_module.load_events()
+    app_module.cached_user_analytics(key)
+
+    _write_events(events_file, second_batch)
+    key, opened, acknowledged = app_module.load_events()
+
+    assert len(opened) == 4
+    assert len(acknowledged) == 2
+    analytics = app_module.cached_user_analytics(key)
+    assert analytics["overall"]["total_events"] == 6
+    assert analytics == app_module.generate_user_analytics(first_batch + second_batch)
+
+
+def test_analytics_are_computed_outside_the_events_lock(client, monkeypatch):
+    _write_events(
+        app_module.EVENTS_FILE,
+        [{"event": "opened", "announcementId": 1, "user": "alice@example.com", "timestamp": "2025-01-01T10:00:00.000000Z"}],
+    )
+    summarize = app_module.summarize_user_analytics
+    acquired = []
+
+    def checking_summarize(*args):
+        # Would time out if the caller were still holding the (non-reentrant) lock.
+        acquired.append(app_module._events_lock.acquire(timeout=1))
+        if acquired[-1]:
+            app_module._events_lock.release()
+        return summarize(*args)
+
+    monkeypatch.setattr(app_module, "summarize_user_analytics", checking_summarize)
+    key, _, _ = app_module.load_events()
+    assert app_module.cached_user_analytics(key)["overall"]["total_events"] == 1
+    assert acquired == [True]
+
+
+def test_append_event_writes_batched_lines(monkeypatch, tmp_path):
+    events_file = tmp_path / "events.json"
+    monkeypatch.setattr(app_module, "EVENTS_FILE", str(events_file))
+
+    for idx in range(5):
+        app_module.append_event({"event": "opened", "announcementId": idx, "user": "alice@example.com"})
+        app_module.append_event({"event": "opened", "announcementId": object()})  # dropped, not written
+    app_module.flush_events()
+
+    lines = events_file.read_text(encoding="utf-8").splitlines()
+    assert [app_module.json.loads(line)["announcementId"] for line in lines] == [0, 1, 2, 3, 4]
+
+    app_module.append_event({"event": "acknowledged", "announcementId": 5, "user": "alice@example.com"})
+    app_module.close_events_log()
+    lines = events_file.read_text(encoding="utf-8").splitlines()
+    assert app_module.json.loads(lines[-1])["announcementId"] == 5
+
+
+def test_events_writer_fsyncs_after_traffic_stops(monkeypatch, tmp_path):
+    synced = []
+    monkeypatch.setattr(app_module, "EVENTS_FILE", str(tmp_path / "events.json"))
+    monkeypatch.setattr(app_module, "EVENTS_FSYNC_SECONDS", 0.05)
+    monkeypatch.setattr(app_module.os, "fsync", synced.append)
+
+    app_module.append_event({"event": "opened", "announcementId": 1, "user": "alice@example.com"})
+    app_module.flush_events()
+    deadline = app_module.time.monotonic() + 2
+    while not synced and app_module.time.monotonic() < deadline:
+        app_module.time.sleep(0.01)
+    assert synced
+
+
+def test_events_writer_syncs_the_log_it_wrote_before_reopening(monkeypatch, tmp_path):
+    synced = []
+    events_file = tmp_path / "events.json"
+    monkeypatch.setattr(app_module, "EVENTS_FILE", str(events_file))
+    monkeypatch.setattr(app_module, "EVENTS_FSYNC_SECONDS", 60)
+    monkeypatch.setattr(app_module.os, "fsync", lambda fd: synced.append(app_module.os.fstat(fd).st_ino))
+
+    app_module.append_event({"event": "opened", "announcementId": 1, "user": "alice@example.com"})
+    app_module.flush_events()
+    rotated_ino = events_file.stat().st_ino
+    app_module.os.replace(events_file, tmp_path / "events-other.jsonl")
+    app_module.append_event({"event": "opened", "announcementId": 2, "user": "alice@example.com"})
+    app_module.flush_events()
+
+    assert synced == [rotated_ino]
+
+
+def test_sms_recipients_cache_tracks_saves_and_env(monkeypatch, tmp_path):
+    monkeypatch.setattr(app_module, "SMS_RECIPIENTS_FILE", str(tmp_path / "sms_recipients.json"))
+    monkeypatch.setenv("SMS_RECIPIENTS", "+15550000001")
+
+    assert app_module.get_sms_recipients() == ["+15550000001"]
+
+    app_module.save_sms_recipients("+15550000002\n+15550000001")
+    assert app_module.get_sms_recipients() == ["+15550000002", "+15550000001"]
+
+    monkeypatch.setenv("SMS_RECIPIENTS", "+15550000003")
+    assert app_module.get_sms_recipients() == ["+15550000002", "+15550000001", "+15550000003"]
+
+    app_module.save_sms_recipients("")
+    assert app_module.get_sms_recipients() == ["+15550000003"]
+
+
+def test_events_log_rotates_and_restores_from_snapshot(client, monkeypatch, tmp_path):
+    events_file = app_module.EVENTS_FILE
+    monkeypatch.setattr(app_module, "EVENTS_SNAPSHOT_FILE", str(tmp_path / "snapshot.json"))
+    monkeypatch.setattr(app_module, "EVENTS_ROTATE_BYTES", 1)
+    records = [
+        {"event": "opened", "announcementId": 1, "user": "alice@example.com", "timestamp": "2025-01-01T10:00:00.000000Z"},
+        {"event": "opened", "announcementId": 1, "user": "bob@example.com", "timestamp": "2025-01-01T10:01:00.000000Z"},
+        {"event": "acknowledged", "announcementId": 1, "user": "alice@example.com", "timestamp": "2025-01-01T10:05:00.000000Z"},
+    ]
+    _write_events(events_file, records)
+
+    key, opened, _ = app_module.load_events()
+    expected = app_module.generate_user_analytics(records)
+    assert app_module.cached_user_analytics(key) == expected
+    assert opened == []  # Tables restart with the fresh log.
+    assert not Path(events_file).exists()
+    assert len(list(tmp_path.glob("events-*.jsonl"))) == 1
+
+    # A fresh process picks the aggregates back up from the snapshot.
+    app_module._reset_events_cache("unrelated.json")
+    key, _, _ = app_module.load_events()
+    assert app_module.cached_user_analytics(key) == expected
+
+
+def test_events_writer_follows_log_rotated_by_another_worker(monkeypatch, tmp_path):
+    events_file = tmp_path / "events.json"
+    monkeypatch.setattr(app_module, "EVENTS_FILE", str(events_file))
+
+    app_module.append_event({"event": "opened", "announcementId": 1, "user": "alice@example.com"})
+    app_module.flush_events()
+    app_module.os.replace(events_file, tmp_path / "events-other.jsonl")  # another worker rotates
+    app_module.append_event({"event": "opened", "announcementId": 2, "user": "alice@example.com"})
+    app_module.flush_events()
+
+    assert [app_module.json.loads(line)["announcementId"] for line in events_file.read_text().splitlines()] == [2]
+    assert len((tmp_path / "events-other.jsonl").read_text().splitlines()) == 1
+
+
+def test_losing_a_rotation_race_restores_instead_of_failing(client, monkeypatch, tmp_path):
+    events_file = app_module.EVENTS_FILE
+    monkeypatch.setattr(app_module, "EVENTS_SNAPSHOT_FILE", str(tmp_path / "snapshot.json"))
+    record = {"event": "opened", "announcementId": 1, "user": "alice@example.com", "timestamp": "2025-01-01T10:00:00.000000Z"}
+    _write_events(events_file, [record])
+    _, opened, _ = app_module.load_events()
+    assert len(opened) == 1
+
+    app_module.os.replace(events_file, tmp_path / "events-other.jsonl")  # another worker won
+    with app_module._events_lock:
+        app_module._rotate_events_log()
+    _write_events(events_file, [dict(record, user="bob@example.com")])
+    _, opened, _ = app_module.load_events()
+    assert len(opened) == 1 and "bob@example.com" in opened[0]
+
+
+def test_dashboard_sms_form_saves_and_renders_numbers(client, monkeypatch, tmp_path):
+    test_client, _ = client
+    monkeypatch.setattr(app_module, "SMS_RECIPIENTS_FILE", str(tmp_path / "sms_recipients.json"))
+    monkeypatch.delenv("SMS_RECIPIENTS", raising=False)
+
+    response = test_client.post("/dashboard", data={"form": "sms", "sms_numbers": "+15550000001, +15550000002"})
+    body = response.data.decode("utf-8")
+    assert "Saved 2 phone number(s)." in body
+    assert "+15550000001\n+15550000002</textarea>" in body
+
+    body = test_client.get("/dashboard").data.decode("utf-8")
+    assert "+15550000001\n+15550000002</textarea>" in body